@@ -7,23 +7,47 @@ import math
 import argparse
 import re
 
-import numpy as np
-#import networkx as nx
-import matplotlib.pyplot as plt
-from graph_tool.all import *
+from scotti_tools import TraceLog, TraceLogError, TreesFollower, TransmissionSummary, TreeFormatError, TreeSelection, parseStateRange, summariseTrees, readTranslate, readHostsCsv, sampledHosts, RENDERERS, RenderError, getRenderer
+
+
+## a percentage of trees, or "auto"
+def burninType(text):
+	if text=="auto":
+		return text
+	return int(text)
 
 
 parser = argparse.ArgumentParser()
 parser.add_argument('--inputF',"-i", help='input file containing the sampled trees in BEAST (usually with extension .trees).',default="")
 parser.add_argument('--outputF',"-o", help='output file containing the inferred transmissions.',default="")
-parser.add_argument('--burnin',"-b", help='percentage of trees to discard (default 20).', type=int, default=20)
+parser.add_argument('--burnin',"-b", help='percentage of trees to discard (default 20), or \"auto\" to discard the trees before the trace log becomes stationary (see --log and --logColumns).', type=burninType, default=20)
+parser.add_argument('--log',"-lg", help='trace log of the run, used with --burnin auto (default: the input file with extension .log instead of .trees).', default="")
+parser.add_argument('--logColumns',"-lC", help='comma separated columns of the trace log whose burnin is found with --burnin auto, the latest one is used (default \"posterior,tree.height\").', default="posterior,tree.height")
+parser.add_argument('--thin',"-th", help='summarise only every thin-th tree after the burnin (default 1, all trees). The other trees are not parsed.', type=int, default=1)
+parser.add_argument('--maxTrees',"-mT", help='summarise at most this number of trees after the burnin and thinning (default 0, no limit).', type=int, default=0)
+parser.add_argument('--sample',"-sa", help='how the trees are chosen with --maxTrees: \"even\" (evenly spaced, default) or \"reservoir\" (at random).', choices=["even","reservoir"], default="even")
+parser.add_argument('--seed',"-sd", help='seed of the random choice of trees with --sample reservoir (default 1).', type=int, default=1)
+parser.add_argument('--stateRange',"-sR", help='summarise only the trees of MCMC states a to b, written a:b (a or b can be left out). Applied after the burnin, use -b 0 to select by state only.', default="")
 parser.add_argument('--minValue',"-m", help='minimum value for which to add edges to the plot (default 0.1).', type=float, default=0.1)
 parser.add_argument('--edgeThickness',"-e", help='maximum thickness of edges (default max 10).', type=float, default=10.)
 parser.add_argument('--vertexFont',"-f", help='vertex font size (default 15).', type=int, default=15)
 parser.add_argument('--vertexColor',"-vC", help='vertex color scale (default \"Greens\").', default="Greens")
 parser.add_argument('--edgeColor',"-eC", help='edge color scale (default \"Reds\").', default="Reds")
 parser.add_argument('--outputSize',"-s", help='output figure size (default 900).', type=int, default=900)
-parser.add_argument('--format',"-fmt", help='format of output plots. (default \"pdf\", but can be any of \"auto\", \"ps\", \"pdf\", \"svg\", and \"png\").', default="pdf")
+parser.add_argument('--format',"-fmt", help='format of output plots. (default \"pdf\", or \"jpg\" with dot, but can be any of \"auto\", \"ps\", \"pdf\", \"svg\", and \"png\").', default="")
+parser.add_argument('--renderer',"-r", help='program used to draw the networks: \"graph_tool\" (default), \"dot\" (Graphviz) or \"matplotlib\". It is only loaded if a plot is made.', choices=sorted(RENDERERS.keys()), default="graph_tool")
+parser.add_argument('--tables',"-t", help='also write the network as tables: \"csv\" (output_edges.csv, output_roots.csv and output_origins.csv) or \"json\" (output_network.json). Can be given twice for both.', choices=["csv","json"], action='append', default=[])
+parser.add_argument('--errors',"-E", help='also estimate the Monte Carlo standard error (MCSE) and effective sample size (ESS) of each probability by batch means, written to output_errors.csv (not used with --follow).', action='store_true')
+parser.set_defaults(errors=False)
+parser.add_argument('--hosts',"-ho", help='optional csv file with the host of each sample (same as used for SCOTTI_generate_xml.py). If specified, hosts are listed in the order of their samples.', default="")
+parser.add_argument('--cache',"-c", help='read the parsed trees from a binary cache next to the input file (built the first time, and again whenever the input file changes).', action='store_true')
+parser.set_defaults(cache=False)
+parser.add_argument('--follow',"-F", help='keep reading the trees file while BEAST2 appends trees to it, rewriting the network file after new trees are found, until the run ends or Ctrl-C is pressed. Plots are made at the end.', action='store_true')
+parser.set_defaults(follow=False)
+parser.add_argument('--interval',"-I", help='seconds between checks of the trees file with --follow (default 60).', type=float, default=60.)
+parser.add_argument('--checkpoint',"-cp", help='file in which to save the counts while reading the trees. If it exists, reading resumes from where it was saved (cannot be used with --jobs, --cache, --follow or a selection of trees).', default="")
+parser.add_argument('--checkpointEvery',"-cpE", help='number of trees between checkpoints (default 1000).', type=int, default=1000)
+parser.add_argument('--jobs',"-j", help='number of processes used to read the trees (default 1).', type=int, default=1)
 parser.add_argument('--noPlotDirect', '-nPD', dest='plotDirect', action='store_false')
 parser.set_defaults(plotDirect=True)
 parser.add_argument('--noPlotIndirect', '-nPI', dest='plotIndirect', action='store_false')
@@ -31,446 +55,129 @@ parser.set_defaults(plotIndirect=True)
 parser.add_argument('--noRootInfo', '-nRI', dest='plotRoot', action='store_false')
 parser.set_defaults(plotRoot=True)
 
-args = parser.parse_args()
 
+## rewrite the network file with the trees summarised so far
+def reportFollow(follower,outputF,tables):
+	summary=TransmissionSummary(follower.counts,follower.numTrees(),follower.burned())
+	summary.writeNetwork(outputF+"_network.txt")
+	summary.writeTables(outputF,tables)
+	print(str(follower.numTrees())+" trees read, the last "+str(summary.numTrees)+" summarised in "+outputF+"_network.txt")
 
-if(args.inputF=="" or args.outputF==""):
-	print("Error, input and output files must be specified with -i and -o options.")
-	exit()
 
+## renderer is the default program used to draw the networks
+def main(renderer="graph_tool"):
+	parser.set_defaults(renderer=renderer)
+	args = parser.parse_args()
 
-## extract information from metadata
-def extractInfo(string):
-	index=0
-	while string[index]!="[":
-		index+=1
-	index2=len(string)-1
-	while string[index2]!="]":
-		index2-=1
-	subString=string[index+1:index2]
-	listTraits=subString.split(",")
-	host="-1"
-	numT="-1"
-	for i in range(len(listTraits)):
-		trait=listTraits[i].split("=")[0]
-		if trait=="&host":
-			host=listTraits[i].split("=")[1]
-		if trait=="numTransmissions":
-			numT=listTraits[i].split("=")[1]
-	if host=="-1" or numT=="-1":
-		print("Traits in tree are not recognised: could not find host or number of transmission events along branch!")
-		print(string)
+	if(args.inputF=="" or args.outputF==""):
+		print("Error, input and output files must be specified with -i and -o options.")
 		exit()
-	return [host,int(numT)]
-
 
-
-## Split tree into 2 subtrees
-def splitTree(tree):
-	if tree[0]!="(" or tree[-1]!=")":
-		print("Tree does not strart or end in parenthesis")
-		print(tree)
+	## Trees summarised after the burnin
+	try:
+		stateRange=(None,None)
+		if args.stateRange!="":
+			stateRange=parseStateRange(args.stateRange)
+		selection=TreeSelection(args.thin,args.maxTrees,stateRange,args.sample=="reservoir",args.seed)
+	except ValueError as error:
+		print("Error, "+str(error)+".")
+		exit()
+	if args.follow and not selection.selectsAll():
+		print("Error, --thin, --maxTrees and --stateRange cannot be used with --follow.")
+		exit()
+	if args.follow and args.errors:
+		print("Error, --errors cannot be used with --follow.")
+		exit()
+	if args.checkpoint!="" and (args.jobs>1 or args.cache or args.follow or not selection.selectsAll()):
+		print("Error, --checkpoint cannot be used with --jobs, --cache, --follow, --thin, --maxTrees or --stateRange.")
 		exit()
-	openCount=0
-	index=0
-	while tree[index]!="," or openCount!=1:
-		if tree[index]=="(" or tree[index]=="[":
-			openCount+=1
-		elif tree[index]==")" or tree[index]=="]":
-			openCount-=1
-		index+=1
-		if index==len(tree):
-			return [tree]
-	
-	return [tree[1:index],tree[index+1:-1]]
-	
-
-## Separate metadata and rest of the tree
-def metaData(tree):
-	#print tree
-	index=len(tree)-1
-	while tree[index]!=")":
-		index-=1
-		if index==0:
-			return [tree]
-	
-	return [tree[0:index+1],tree[index+1:]]
-	
-## Find new hosts in the tree
-def recurFindHosts(tree,hosts):
-	mt=metaData(tree)
-	if len(mt)>1:
-		host=extractInfo(mt[1])[0]
-	else:
-		host=extractInfo(mt[0])[0]
-	if (host!="Unsampled") and (not (host in hosts )):
-		hosts.append(host)
-		#print host+" added to host list"
-	if len(mt)>1:
-		splitT=splitTree(mt[0])
-		recurFindHosts(splitT[0],hosts)
-		recurFindHosts(splitT[1],hosts)
 
+	if args.follow and args.burnin=="auto":
+		print("Error, --burnin auto cannot be used with --follow.")
+		exit()
 
-## perform one recursion on one subtree
-def handleTree(mt,root,parentHost,numTransParent,directTrans,indirectTrans,metAlready,metAlreadyInd,origins):
-	#print mt
-	#print origins
-	#print root
-	#print parentHost
-	#print numTransParent
-	if root[1]==0: #no change
-		#print origins
-		#print "\n\n"
-		if len(mt)>1:
-			recurTransm(mt[0],parentHost,numTransParent,directTrans,indirectTrans,metAlready,metAlreadyInd,origins)
-			
-	elif root[0]=="Unsampled": #going to an unsampled node
-		#print origins
-		#print "\n\n"
-		if len(mt)>1:
-			recurTransm(mt[0],parentHost,numTransParent+root[1],directTrans,indirectTrans,metAlready,metAlreadyInd,origins)
-				
-	elif parentHost=="Unsampled": #coming from an unsampled node
-		if root[0]!="Unsampled":
-			if not (root[0] in origins.keys()):
-				origins[root[0]]="Unsampled"
-		#print origins
-		#print "\n\n"
-		if len(mt)>1:
-			recurTransm(mt[0],root[0],0,directTrans,indirectTrans,metAlready,metAlreadyInd,origins)
-		
-	elif parentHost!=root[0]: #from one host into a different one, both sampled
-		if (root[1]+numTransParent)==1: #direct transmission
-			if ((not parentHost in metAlready.keys()) or (not root[0] in metAlready[parentHost])) and ((not parentHost in metAlreadyInd.keys()) or (not root[0] in metAlreadyInd[parentHost])):
-				if parentHost in metAlready.keys():
-					metAlready[parentHost].append(root[0])
-				else:
-					metAlready[parentHost]=[root[0]]
-				directTrans[parentHost][root[0]]+=1
-			if root[0] in origins.keys():
-				if origins[root[0]]!=parentHost and origins[root[0]]!="Unsampled":
-					origins[root[0]]="doubleOrigin"
-				else:
-					origins[root[0]]=parentHost
-			else:
-				origins[root[0]]=parentHost
-		elif (root[1]+numTransParent)>1: #indirect transmission
-			if ((not parentHost in metAlready.keys()) or (not root[0] in metAlready[parentHost])) and ((not parentHost in metAlreadyInd.keys()) or (not root[0] in metAlreadyInd[parentHost])):
-				if parentHost in metAlreadyInd.keys():
-					metAlreadyInd[parentHost].append(root[0])
-				else:
-					metAlreadyInd[parentHost]=[root[0]]
-				indirectTrans[parentHost][root[0]].append(root[1]+numTransParent)
-			if not (root[0] in origins.keys()):
-				origins[root[0]]="Unsampled"
-		else:
-			print("there is a problem, this should not be 0")
-			print(root[1]+numTransParent)
+	## With --burnin auto, the trees before the state at which the traces of the log
+	## columns become stationary are discarded
+	burninState=None
+	if args.burnin=="auto":
+		logFile=args.log
+		if logFile=="":
+			logFile=os.path.splitext(args.inputF)[0]+".log"
+		if not os.path.isfile(logFile):
+			print("Error, trace log "+logFile+" not found, specify it with --log or give the burnin as a percentage.")
 			exit()
-		#print origins
-		#print "\n\n"
-		if len(mt)>1:
-			recurTransm(mt[0],root[0],0,directTrans,indirectTrans,metAlready,metAlreadyInd,origins)
-	else: #from one host to itself
-		if root[1]+numTransParent==1: #direct transmission?
-			print("there is a problem, this should not be 1")
-			print(root[1]+numTransParent)
+		columns=[name for name in args.logColumns.split(",") if name!=""]
+		try:
+			trace=TraceLog(logFile,columns)
+		except TraceLogError as error:
+			print(error)
 			exit()
-		if ((not parentHost in metAlready.keys()) or (not root[0] in metAlready[parentHost])) and ((not parentHost in metAlreadyInd.keys()) or (not root[0] in metAlreadyInd[parentHost])):
-			if parentHost in metAlreadyInd.keys():
-				metAlreadyInd[parentHost].append(root[0])
-			else:
-				metAlreadyInd[parentHost]=[root[0]]
-			indirectTrans[parentHost][root[0]].append(root[1]+numTransParent)
-		if not (root[0] in origins.keys()):
-			origins[root[0]]="Unsampled"
-		#print origins
-		#print "\n\n"
-		if len(mt)>1:
-			recurTransm(mt[0],root[0],0,directTrans,indirectTrans,metAlready,metAlreadyInd,origins)
-		
-	
-
-
-# Update counts of transmission samples
-def recurTransm(tree,parentHost,numTransParent,directTrans,indirectTrans,metAlready,metAlreadyInd,origins):
-	splitT=splitTree(tree)
-	#subtree1
-	mt=metaData(splitT[0])
-	root=extractInfo(mt[len(mt)-1])
-	handleTree(mt,root,parentHost,numTransParent,directTrans,indirectTrans,metAlready,metAlreadyInd,origins)
-	#subtree2
-	mt=metaData(splitT[1])
-	root=extractInfo(mt[len(mt)-1])
-	handleTree(mt,root,parentHost,numTransParent,directTrans,indirectTrans,metAlready,metAlreadyInd,origins)
-	
-	
-	
-## Read file to find burnin
-inpF=open(args.inputF)
-line="\n"
-while len(line.split())<1 or line.split()[0]!="tree":
-	line=inpF.readline()
-	if line=="":
-		print("Incorrect input file, is this a BEAST2 trees output file?")
-		exit()
-numTrees=0
-normalL=len(line.split())
-while len(line.split())==normalL and line.split()[0]=="tree":
-	numTrees+=1
-	line=inpF.readline()
-
-burned=(float(args.burnin)/100)*numTrees
-print("The first "+str(int(burned))+" trees out of "+str(numTrees)+" will be discarded as burnin.")
-
-## re-Read file to find trees and collect values
-inpF=open(args.inputF)
-line="\n"
-while len(line.split())<1 or line.split()[0]!="tree":
-	line=inpF.readline()
-	if line=="":
-		print("Incorrect input file, is this a BEAST2 trees output file?")
+		if len(trace)==0:
+			print("Error, no states found in trace log "+logFile+".")
+			exit()
+		start,starts=trace.burnin()
+		burninState=int(trace.states[start])
+		print("Trace log "+logFile+": "+", ".join([name+" stationary from state "+str(trace.states[starts[name]])+" (ESS "+str(round(trace.ess(name,starts[name]),1))+")" for name in columns])+".")
+		print("The burnin ends at state "+str(burninState)+", after "+str(start)+" of the "+str(len(trace))+" logged states.")
+
+	## Hosts listed in the hosts file come first, in the order of the samples in the trees file
+	hostOrder=[]
+	if args.hosts!="":
+		hostOrder=sampledHosts(readHostsCsv(args.hosts),readTranslate(args.inputF).values())
+
+	try:
+		if args.follow:
+			## Summarise the trees written so far, then again whenever trees are appended
+			follower=TreesFollower(args.inputF,args.burnin,hostOrder)
+			follower.follow(args.interval,lambda follower: reportFollow(follower,args.outputF,args.tables))
+			summary=TransmissionSummary(follower.counts,follower.numTrees(),follower.burned())
+		else:
+			summary=summariseTrees(args.inputF,args.burnin,hostOrder,args.cache,args.jobs,args.checkpoint,args.checkpointEvery,verbose=True,selection=selection,errors=args.errors,burninState=burninState)
+	except TreeFormatError as error:
+		print(error)
 		exit()
-hosts=[]
-directTrans={}
-indirectTrans={}
-totOrigins={}
-roots={}
-roots["Unsampled"]=0
-numTrees=0
-normalL=len(line.split())
-while len(line.split())==normalL and line.split()[0]=="tree":
-
-	if numTrees<int(burned):
-		numTrees+=1
-		line=inpF.readline()
-		continue
-	tree=line.split()[3]
-
-	recurFindHosts(tree,hosts)
-	
-	if len(directTrans.keys())<len(hosts):
-		for i in range(len(hosts)):
-			if not (hosts[i] in directTrans.keys()):
-				directTrans[hosts[i]]={}
-				indirectTrans[hosts[i]]={}
-				roots[hosts[i]]=0
-				for j in range(len(hosts)):
-					directTrans[hosts[i]][hosts[j]]=0
-					indirectTrans[hosts[i]][hosts[j]]=[]
-					
-	mt=metaData(tree)
-	root=extractInfo(mt[1])
-	roots[root[0]]+=1
-	metAlready={}
-	metAlreadyInd={}
-	origins={}
-	if root[0]!="Unsampled":
-		origins[root[0]]="Unsampled"
-	recurTransm(mt[0],root[0],0,directTrans,indirectTrans,metAlready,metAlreadyInd,origins)#what happens if the root is sampled????????????????????????????????????????????????????????????????
-	#print "final origins:"
-	#print origins
-	#print "\n\n\n\n"
-	#exit()
-	numTrees+=1
-	line=inpF.readline()
-	for host in origins.keys():
-		if host in totOrigins.keys():
-			if origins[host] in totOrigins[host].keys():
-				totOrigins[host][origins[host]]+=1
-			else:
-				totOrigins[host][origins[host]]=1
+	if summary.numTrees==0:
+		if not selection.selectsAll() and summary.totTrees>summary.burned:
+			print("Error, no trees were summarised: none of the "+str(summary.totTrees-summary.burned)+" trees after the burnin match the selection ("+selection.describe()+").")
 		else:
-			totOrigins[host]={}
-			totOrigins[host][origins[host]]=1
-
-numTrees=numTrees-int(burned)
-
-#print("Hosts: ")
-#print(hosts)
-#print("\n\n Direct transmissions: ")
-#print(directTrans)
-#print("\n\n Indirect transmissions: ")
-#print(indirectTrans)
-#print("\n\n Roots: ")
-#print(roots)
-#print("\n\n nummTrees: ")
-#print(numTrees)
-
-
-#Record inferred network in text file
-#hosts
-outF=open(args.outputF+"_network.txt","w")
-outF.write("Hosts: ")
-for i in range(len(hosts)):
-	outF.write(hosts[i]+", ")
-outF.write("\n\n\n")
-#roots
-outF.write("Probabilities of being root: ")
-for i in range(len(hosts)):
-	outF.write(hosts[i]+" "+str(float(roots[hosts[i]])/numTrees)+", ")
-outF.write("\n\n\n")
-#direct transmissions
-outF.write("Probabilities direct transmission: \n\n")
-for i in range(len(hosts)):
-	outF.write("From host "+hosts[i]+" to : \n")
-	for j in range(len(hosts)):
-		if j!= i and (directTrans[hosts[i]][hosts[j]])!=0:
-			outF.write(hosts[j]+" "+str(float(directTrans[hosts[i]][hosts[j]])/numTrees)+", ")
-	outF.write("\n\n")
-outF.write("\n\n")
-#indirect transmissions
-outF.write("Probabilities indirect transmission: \n")
-for i in range(len(hosts)):
-	outF.write("From host "+hosts[i]+" to : \n")
-	for j in range(len(hosts)):
-		if j!= i and (len(indirectTrans[hosts[i]][hosts[j]]))!=0:
-			outF.write(hosts[j]+" "+str(float(len(indirectTrans[hosts[i]][hosts[j]]))/numTrees)+", ")
-	outF.write("\n\n")
-outF.write("\n\n")
-#origins
-outF.write("Probabilities of direct transmittor to each sampled host: \n\n")
-for i in range(len(hosts)):
-	outF.write("To host "+hosts[i]+" from : \n")
-	if hosts[i] in totOrigins.keys():
-		for j in range(len(hosts)):
-			if j!= i and (hosts[j] in totOrigins[hosts[i]].keys()):
-				outF.write(hosts[j]+" "+str(float(totOrigins[hosts[i]][hosts[j]])/numTrees)+", ")
-		if "Unsampled" in totOrigins[hosts[i]].keys():
-			outF.write("Unsampled"+" "+str(float(totOrigins[hosts[i]]["Unsampled"])/numTrees)+", ")
-		if "doubleOrigin" in totOrigins[hosts[i]].keys():
-			outF.write("doubleOrigin"+" "+str(float(totOrigins[hosts[i]]["doubleOrigin"])/numTrees)+", ")
-		outF.write("\n\n")
-outF.write("\n\n")
-outF.close()
-print("\n\n"+"File "+args.outputF+"_network.txt containing output information successfully created!\n\n")
-
-
-
+			print("Error, no trees were summarised: "+str(summary.totTrees)+" trees found in "+args.inputF+", "+str(summary.burned)+" of them discarded as burnin.")
+		exit()
 
-#Make graph for direct transmissions with graph_tools
-plotD=args.plotDirect
-if(plotD):
-	minV=float(args.minValue)
-	g = Graph()
-	verteces=[]
-	directEdges=[]
-	for h1 in hosts:
-		verteces.append(g.add_vertex())
-	for h1 in range(len(hosts)):
-		for h2 in range(len(hosts)):
-			if (float(directTrans[hosts[h1]][hosts[h2]])/numTrees)>minV:
-				directEdges.append(g.add_edge(verteces[h1], verteces[h2]))
-				
-				
-	#Add information to graph
-	eThick=float(args.edgeThickness)
-	
-	plotR=args.plotRoot
-	rootProb = g.new_vertex_property("double")
-	if plotR:
-		rootProbText = g.new_vertex_property("string")
-	for h1 in range(len(hosts)):
-		rootProb[g.vertex(h1)]=float(roots[hosts[h1]])/numTrees
-		if plotR:
-			rootProbText[g.vertex(h1)]=("%.2f" % (float(roots[hosts[h1]])/numTrees))
-	g.vertex_properties["root probability"] = rootProb
-	if plotR:
-		g.vertex_properties["root probability, text"] = rootProbText
-	vertName = g.new_vertex_property("string")
-	for h1 in range(len(hosts)):
-		if plotR:
-			vertName[g.vertex(h1)]=hosts[h1]+" "+("%.2f" % (float(roots[hosts[h1]])/numTrees))
+	#Record inferred network in text file
+	summary.writeNetwork(args.outputF+"_network.txt")
+	print("\n\n"+"File "+args.outputF+"_network.txt containing output information successfully created!\n\n")
+	for fileName in summary.writeTables(args.outputF,args.tables):
+		print("File "+fileName+" successfully created!\n")
+	if summary.hasErrors():
+		batchMeans=summary.counts.batchMeans
+		if batchMeans.numBatches<2:
+			print("Warning: only "+str(batchMeans.numBatches)+" complete batches of "+str(batchMeans.batchSize)+" trees were summarised, too few to estimate the Monte Carlo errors. "+args.outputF+"_errors.csv was not written.\n")
 		else:
-			vertName[g.vertex(h1)]=hosts[h1]
-	g.vertex_properties["host name"] = vertName
-	
-	transProb = g.new_edge_property("double")
-	transProbText = g.new_edge_property("string")
-	#print hosts
-	for h1 in range(len(hosts)):
-		for h2 in range(len(hosts)):
-			#print hosts[h1]
-			#print hosts[h2]
-			#print float(directTrans[hosts[h1]][hosts[h2]])/numTrees
-			if (float(directTrans[hosts[h1]][hosts[h2]])/numTrees)>minV:
-				#print "sufficiently large"
-				transProb[g.edge(h1,h2)] = (float(directTrans[hosts[h1]][hosts[h2]])/numTrees)*eThick +2.0
-				transProbText[g.edge(h1,h2)] = ("%.2f" % ((float(directTrans[hosts[h1]][hosts[h2]])/numTrees)))
-	g.edge_properties["direct transmission probability"] = transProb
-	g.edge_properties["direct transmission probability, text"] = transProbText	
-				
-	#plot direct  transmission graph
-	vFont=int(args.vertexFont)
-	vColor=args.vertexColor
-	eColor=args.edgeColor
-	oSize=args.outputSize
-	oformat=args.format
-	#print("plotting")
-	#print transProb
-	graph_draw(g, vertex_text=vertName, vertex_font_size=vFont, output_size=(oSize, oSize), edge_pen_width=transProb, output=args.outputF+"_direct_transmissions."+oformat, vertex_fill_color=rootProb, vcmap=plt.get_cmap(vColor), vertex_pen_width=2.0, bg_color=[1., 1., 1., 1.], edge_text=transProbText, edge_color=transProb, ecmap=plt.get_cmap(eColor), fmt=oformat)
-	print("\n\n"+"File "+args.outputF+"_direct_transmissions."+oformat+" containing graph of direct transmission successfully created!\n\n")	
-	
-
-
-
-#Make graph for indirect transmissions with graph_tools
-plotI=args.plotIndirect
-if(plotI):
-	minV=float(args.minValue)
-	g = Graph()
-	verteces=[]
-	directEdges=[]
-	for h1 in hosts:
-		verteces.append(g.add_vertex())
-	for h1 in range(len(hosts)):
-		for h2 in range(len(hosts)):
-			if (float(len(indirectTrans[hosts[h1]][hosts[h2]])+directTrans[hosts[h1]][hosts[h2]])/numTrees)>minV:
-				directEdges.append(g.add_edge(verteces[h1], verteces[h2]))
-				
-				
-	#Add information to graph
-	eThick=float(args.edgeThickness)
-	
-	rootProb = g.new_vertex_property("double")
-	for h1 in range(len(hosts)):
-		rootProb[g.vertex(h1)]=float(roots[hosts[h1]])/numTrees
-	g.vertex_properties["root probability"] = rootProb
-	vertName = g.new_vertex_property("string")
-	for h1 in range(len(hosts)):
-		vertName[g.vertex(h1)]=hosts[h1]
-	g.vertex_properties["host name"] = vertName
-	
-	transProb = g.new_edge_property("double")
-	transProbText = g.new_edge_property("string")
-	#print hosts
-	for h1 in range(len(hosts)):
-		for h2 in range(len(hosts)):
-			#print hosts[h1]
-			#print hosts[h2]
-			#print float(directTrans[hosts[h1]][hosts[h2]]+len(indirectTrans[hosts[h1]][hosts[h2]]))/numTrees
-			if (float(directTrans[hosts[h1]][hosts[h2]]+len(indirectTrans[hosts[h1]][hosts[h2]]))/numTrees)>minV:
-				#print "sufficiently large"
-				transProb[g.edge(h1,h2)] = (float(directTrans[hosts[h1]][hosts[h2]]+len(indirectTrans[hosts[h1]][hosts[h2]]))/numTrees)*eThick +2.0
-				transProbText[g.edge(h1,h2)] = ("%.2f" % ((float(directTrans[hosts[h1]][hosts[h2]]+len(indirectTrans[hosts[h1]][hosts[h2]]))/numTrees)))
-	g.edge_properties["direct + indirect transmission probability"] = transProb
-	g.edge_properties["direct + indirect transmission probability, text"] = transProbText	
-				
-	#plot indirect  transmission graph
-	vFont=int(args.vertexFont)
-	vColor=args.vertexColor
-	eColor=args.edgeColor
-	oSize=args.outputSize
-	oformat=args.format
-	
-	#print("plotting again")
-	#print transProb
-	graph_draw(g, vertex_text=vertName, vertex_font_size=vFont, output_size=(oSize, oSize), edge_pen_width=transProb, output=args.outputF+"_indirect_transmissions."+oformat, vertex_fill_color=rootProb, vcmap=plt.get_cmap(vColor), vertex_pen_width=2.0, bg_color=[1., 1., 1., 1.], edge_text=transProbText, edge_color=transProb, ecmap=plt.get_cmap(eColor), fmt=oformat)	
-	print("\n\n"+"File "+args.outputF+"_indirect_transmissions."+oformat+" containing graph of indirect transmission successfully created!\n\n")
-	
-	
-exit()
-
+			summary.writeErrors(args.outputF+"_errors.csv")
+			print("File "+args.outputF+"_errors.csv containing the Monte Carlo errors ("+str(batchMeans.numBatches)+" batches of "+str(batchMeans.batchSize)+" trees) successfully created!\n")
+
+	#Make graphs for direct and direct + indirect transmissions
+	if args.plotDirect or args.plotIndirect:
+		renderer=getRenderer(args.renderer)
+		oformat=renderer.format(args.format)
+		created=[]
+		try:
+			if args.plotDirect:
+				renderer.draw(args.outputF+"_direct_transmissions."+oformat,summary.hosts,summary.directProb,summary.rootProb,args,args.plotRoot,oformat)
+				created.append((args.outputF+"_direct_transmissions."+oformat,"direct"))
+			if args.plotIndirect:
+				renderer.draw(args.outputF+"_indirect_transmissions."+oformat,summary.hosts,summary.directTrans.plus(summary.indirectTrans).divided(summary.numTrees),summary.rootProb,args,False,oformat)
+				created.append((args.outputF+"_indirect_transmissions."+oformat,"indirect"))
+			renderer.close()
+		except ImportError as error:
+			print("Error, the "+renderer.name+" renderer cannot be loaded ("+str(error)+"). Choose another one with --renderer, or skip the plots with -nPD -nPI.")
+			exit()
+		except RenderError as error:
+			print("Error, the transmission graphs could not be drawn. "+str(error))
+			exit()
+		for fileName,kind in created:
+			print("\n\n"+"File "+fileName+" containing graph of "+kind+" transmission successfully created!\n\n")
 
 
+if __name__=="__main__":
+	main()
@@ -2,6 +2,9 @@ import sys
 import os
 import math
 import argparse
+import shutil
+
+from scotti_tools import FastaIndex, FastaFormatError, constantSites, selectSites, SampleInputs, parseGrid, gridSettings, sweepName
 #import random
 #import re
 #import os.path
@@ -76,14 +79,32 @@ parser.add_argument('--fixedAs', "-fA", type=int, help = 'Number of sites fixed
 parser.add_argument('--fixedCs', "-fC", type=int, help = 'Number of sites fixed for C in the genome and not included in the alignment.',default=0)
 parser.add_argument('--fixedGs', "-fG", type=int, help = 'Number of sites fixed for G in the genome and not included in the alignment.',default=0)
 parser.add_argument('--fixedTs', "-fT", type=int, help = 'Number of sites fixed for T in the genome and not included in the alignment.',default=0)
+parser.add_argument('--removeConstantSites', "-rc", action='store_true', help = 'Find the sites where all sequences have the same base, write only the other sites in the alignment, and add the constant ones to the numbers of fixed sites (see --fixedAs, --fixedCs, --fixedGs and --fixedTs).')
+parser.set_defaults(removeConstantSites=False)
 parser.add_argument('--tracelog',"-l", help='Logging frequency in the trace file. Default=numIter/10000.', type=int, default=-1)
 parser.add_argument('--screenlog',"-sl", help='Logging frequency to the screen. Default=numIter/5000.', type=int, default=-1)
 parser.add_argument('--treelog',"-tl", help='Logging frequency in the tree file. Default=numIter/1000.', type=int, default=-1)
+parser.add_argument('--grid',"-g", action='append', default=[], help='Write one analysis for each combination of values of some settings, given as setting=value1,value2,... for the settings maxHosts, unlimLife, penalizeMigration, mutationModel and numIter (repeat the option to vary several of them). The inputs are read once, and each analysis is written to the output name followed by its settings, e.g. SCOTTI_analysis_maxHosts20_mutationModelJC.xml.')
 
 
 
 args = parser.parse_args()
 
+#analyses to write: one for each combination of values of the grid, or only the
+#one of the options without a grid
+try:
+    grid=parseGrid(args.grid)
+except ValueError as error:
+    print("Error: "+str(error)+"\n")
+    exit()
+runs=[]
+for combination in gridSettings(grid):
+    opts=argparse.Namespace(**vars(args))
+    for name in combination:
+        setattr(opts,name,combination[name])
+    opts.output=sweepName(args.output,combination)
+    runs.append(opts)
+
 
 #if !(os.path.isfile(args.template)):
 #    print "Error: template file SCOTTI_template.xml not found, please specify it correctly in input using the option -t .\n"
@@ -91,9 +112,10 @@ args = parser.parse_args()
 if (not (os.path.isfile(args.fasta))):
     print("Error: input fasta file not found, please specify it correctly in input using the option -f .\n")
     exit()
-if (os.path.isfile(args.output + ".xml")) and (not args.overwrite):
-    print("Output xml file already exists, to allow overwriting of output file use option -ov, otherwise specify a different output file.\n")
-    exit()
+for opts in runs:
+    if (os.path.isfile(opts.output + ".xml")) and (not args.overwrite):
+        print("Output xml file already exists, to allow overwriting of output file use option -ov, otherwise specify a different output file.\n")
+        exit()
 if not (os.path.isfile(args.dates)):
     print("Error: input dates csv file not found, please specify it correctly in input using the option -d .\n")
     exit()
@@ -103,300 +125,189 @@ if not (os.path.isfile(args.hosts)):
 if not (os.path.isfile(args.hostTimes)):
     print("Error: input hosts csv file not found, please specify it correctly in input using the option -i .\n")
     exit()
-if (args.numIter<=0):
-    print("Error: the number of MCMC iterations specified is negative or null.\n")
-    exit()
-elif (args.numIter<=1000):
-    print("Very small number of MCMC iterations, might want to specifiy something bigger.\n")
-if (args.mutationModel!="HKY" and args.mutationModel!="JC"):
-    print("Mutation model not supported. Please specify something among \"HKY\" or \"JC\".\n")
-    exit()
+for opts in runs:
+    if (opts.numIter<=0):
+        print("Error: the number of MCMC iterations specified is negative or null.\n")
+        exit()
+    elif (opts.numIter<=1000):
+        print("Very small number of MCMC iterations, might want to specifiy something bigger.\n")
+    if (opts.mutationModel!="HKY" and opts.mutationModel!="JC"):
+        print("Mutation model not supported. Please specify something among \"HKY\" or \"JC\".\n")
+        exit()
 if (args.fixedAs<0 or args.fixedCs<0 or args.fixedGs<0 or args.fixedTs<0):
     print("Error: the number of fixed sites for each base type must be positive.\n")
     exit()
 
-#read fasta file
-sqFile=open(args.fasta)
-seqs={}
-line=sqFile.readline()
-linesplit=line.split()
-while line!="" and (len(linesplit)<1 or linesplit[0][0]!=">"):
-    line=sqFile.readline()
-    linesplit=line.split()
-if line=="":
-    print("Wrong format in fasta file\n")
+#index fasta file: only the names and positions of the sequences are kept, the
+#sequences are read again one at a time when the xml is written
+try:
+    seqs=FastaIndex(args.fasta)
+except FastaFormatError as error:
+    print(error)
     exit()
-while line!="":
-    if len(linesplit[0])>1:
-        name=linesplit[0].replace(">","")
-    else:
-        name=linesplit[1]
-    seq=""
-    line=sqFile.readline()
-    linesplit=line.split()
-    while line!="" and (len(linesplit)>0  and linesplit[0][0]!=">") and line!="\n":
-        seq+=linesplit[0]
-        line=sqFile.readline()
-        linesplit=line.split()
-    if name in seqs.keys():
-        print("Error, multiple entries with same name "+name+" in fasta file. Only first part of the name line is used for the name.")
-        exit()
-    seqs[name]=seq
-    while line!="" and  (len(linesplit)<1 or linesplit[0][0]!=">"):
-        line=sqFile.readline()
-        linesplit=line.split()
-sqFile.close()
-
-#read in file with host-sample information
-hFile=open(args.hosts)
-hosts={}
-line=hFile.readline()
-linesplit=("".join(line.split())).split(",")  
-while line!="" and len(linesplit)>1: 
-    sam=linesplit[0]
-    hos=linesplit[1]
-    if not (sam in seqs.keys()):
-        print("Error: sample "+sam+" found in sample-host file but not found in the fasta file.")
-        exit()
-    if sam in hosts.keys():
-        print("Error, multiple entries with same name "+sam+" in hosts file. ")
-        exit()
-    hosts[sam]=hos
-    line=hFile.readline()
-    linesplit=("".join(line.split())).split(",")
-    while line=="\n":
-        line=hFile.readline()
-        linesplit=("".join(line.split())).split(",")
-hFile.close()
-
-#read in sampling dates
-dFile=open(args.dates)
-dates={}
-line=dFile.readline()
-linesplit=("".join(line.split())).split(",")  
-while line!="" and len(linesplit)>1:  
-    sam=linesplit[0]
-    dat=linesplit[1]
-    if not (IsFloat(dat)):
-        print("Error: date "+str(dat)+" for sample "+sam+" cannot be converted to a number")
-        exit()
-    if not (sam in seqs.keys()):
-        print("Error: sample "+sam+" found in sampling dates file but not found in the fasta file.")
-        exit()
-    if sam in dates.keys():
-        print("Error, multiple entries with same name "+sam+" in dates file. ")
-        exit()
-    dates[sam]=float(dat)
-    line=dFile.readline()
-    linesplit=("".join(line.split())).split(",")
-    while line=="\n":
-        line=dFile.readline()
-        linesplit=("".join(line.split())).split(",")
-dFile.close()
-    
-#read in file with host times information
-hFile=open(args.hostTimes)
-hostT={}
-line=hFile.readline()
-linesplit=("".join(line.split())).split(",")  
-while line!="" and len(linesplit)>2: 
-    hos=linesplit[0]
-    dat=float(linesplit[1])
-    dat2=float(linesplit[2])
-    if (not (IsFloat(dat))) or (not (IsFloat(dat2))):
-        print("Error: date "+str(dat)+" or "+str(dat2)+" for sample "+sam+" cannot be converted to a number")
-        exit()
-    #if not (hos in seqs.keys()):
-    #    print "Error: sample "+hos+" found in host times file but not found in the fasta file."
-    #    exit()
-    if hos in hostT.keys():
-        print("Error, multiple entries with same name "+hos+" in hosts-times file. ")
-        exit()
-    hostT[hos]=[dat, dat2]
-    line=hFile.readline()
-    linesplit=("".join(line.split())).split(",")
-    while line=="\n":
-        line=hFile.readline()
-        linesplit=("".join(line.split())).split(",")
-hFile.close()
-
-
-    
-#check that the details are correct
-for s in seqs.keys():
-    if not (s in dates.keys()):
-        print("Error, no date specified for sample "+s)
-        exit()
-    if not (s in hosts.keys()):
-        print("Error, no host specified for sample "+s)
-        exit()
-for s in hosts.keys():
-    if not (s in seqs.keys()):
-        print("Error, no sequence specified for sample "+s)
-        exit()
-    if not (s in dates.keys()):
-        print("Error, no date specified for sample "+s)
-        exit()
-for s in dates.keys():
-    if not (s in seqs.keys()):
-        print("Error, no sequence specified for sample "+s)
-        exit()
-    if not (s in hosts.keys()):
-        print("Error, no host specified for sample "+s)
-        exit()
-for s in hosts.keys():
-    if not (hosts[s] in hostT.keys()):
-        print("Warning: no dates specified for host "+hosts[s]+". I will assume this host is available throughout")
-        hostT[hosts[s]]=[-1000000000000,1000000000000]
 
-
-for h in hostT.keys():
-    found=0
-    for s in hosts.keys():
-        if hosts[s]==h:
-            found=1
-    if found==0:
-        print("Warning: no sample specified for host "+h+". I will assume this host could have been infected or not. If you are sure this host was infected, then please include a non-informative sample (all \"N\"s) from it.")
+#read in the hosts, sampling dates and host times of the samples, and check them
+#all together
+inputs=SampleInputs(seqs,args.hosts,args.dates,args.hostTimes)
+for warning in inputs.warnings:
+    print(warning)
+if len(inputs.errors)>0:
+    for error in inputs.errors:
+        print(error)
+    exit()
+hosts=inputs.hosts
+dates=inputs.dates
+hostT=inputs.hostTimes
 
   
-# logging frequency
-tracelog  = args.tracelog  if args.tracelog  > 0 else int(args.numIter/10000)
-screenlog = args.screenlog if args.screenlog > 0 else int(args.numIter/5000)
-treelog   = args.treelog   if args.treelog   > 0 else int(args.numIter/1000)
-    
-    
-    
-xml=open(args.output+".xml","w")
+#constant sites are counted in the fixed sites, only variable sites are written
+columns=None
+if args.removeConstantSites:
+    try:
+        columns,constantCounts=constantSites(seqs)
+    except FastaFormatError as error:
+        print(error)
+        exit()
+    if len(columns)==0:
+        print("Warning: all sites of the alignment are constant, the full alignment is written.")
+        columns=None
+    else:
+        print("Found "+str(sum(constantCounts))+" constant sites, the alignment is written with its "+str(len(columns))+" other sites.")
+        args.fixedAs+=constantCounts[0]
+        args.fixedCs+=constantCounts[1]
+        args.fixedGs+=constantCounts[2]
+        args.fixedTs+=constantCounts[3]
+
+#the data and the trait sets do not depend on the settings of the grid: they are
+#written once, for the first analysis, and copied for the others
+xml=open(runs[0].output+".xml","w")
 xml.write("<beast version=\'2.0\' namespace=\'beast.evolution.alignment:beast.core:beast.core.parameter:beast.evolution.tree:beast.evolution.tree.coalescent:beast.core.util:beast.evolution.operators:beast.evolution.sitemodel:beast.evolution.substitutionmodel:beast.evolution.likelihood:beast.evolution.tree:beast.math.distributions:multitypetreeVolz.distributions:multitypetreeVolz.operators:multitypetreeVolz.util\'>\n\n"+"  <data id=\"alignmentVar\" dataType=\"nucleotide\">\n")
-for s in seqs.keys():
-    xml.write("    <sequence taxon=\'"+s+"\' value=\'"+seqs[s]+"\'/>\n")
+for s,seq in seqs.sequences():
+    if columns is not None:
+        seq=selectSites(seq,columns)
+    xml.write("    <sequence taxon=\'"+s+"\' value=\'"+seq+"\'/>\n")
 xml.write("  </data>\n")
 st=""
-if args.fixedAs>0 and args.fixedCs>0 and args.fixedGs>0 and args.fixedTs>0:
+if (args.fixedAs>0 and args.fixedCs>0 and args.fixedGs>0 and args.fixedTs>0) or (columns is not None and args.fixedAs+args.fixedCs+args.fixedGs+args.fixedTs>0):
     st="constantSiteWeights=\'"+str(args.fixedAs)+" "+str(args.fixedCs)+" "+str(args.fixedGs)+" "+str(args.fixedTs)+"\'"
 xml.write("  <data id=\'alignment\' spec=\'FilteredAlignment\' filter=\'-\' data=\'@alignmentVar\' "+st+"/>\n\n")
 
 #hosts
 xml.write("   <typeTraitSet spec=\'TraitSetWithLimits\' id=\'typeTraitSet\' traitname=\"type\" value=\"")
-hL=list(hosts.keys())
-for s in hL:
-    xml.write(s+"="+hosts[s])
-    if s!=hL[len(hL)-1]:
-        xml.write(",")
+xml.write(",".join([s+"="+hosts[s] for s in hosts]))
 xml.write("\">\n     <taxa spec=\'TaxonSet\' alignment=\'@alignment\'/>\n   </typeTraitSet>\n\n")
 
 #dates
 xml.write("   <timeTraitSet spec=\'TraitSetWithLimits\' id=\'timeTraitSet\' traitname=\"date-forward\" value=\"")
-dL=list(dates.keys())
-for s in range(len(dL)):
-    xml.write(dL[s]+"="+str(dates[dL[s]]))
-    if (s!=(len(dL)-1)):
-        xml.write(",")
+xml.write(",".join([s+"="+str(dates[s]) for s in dates]))
 xml.write("\">\n     <taxa spec=\'TaxonSet\' alignment=\'@alignment\'/>\n   </timeTraitSet>\n\n")
 
 #end infectability
 xml.write("   <endInfectionsTraitSet spec=\'InfectionTraitSet\' id=\'endInfectionsTraitSet\' type=\'end\' traitname=\"date-forward\" value=\"")
-dL=list(hostT.keys())
-for s in dL:
-    xml.write(s+"="+str(hostT[s][1]))
-    if s!=dL[len(dL)-1]:
-        xml.write(",")
+xml.write(",".join([h+"="+str(hostT[h][1]) for h in hostT]))
 xml.write("\">\n 	  <taxaDates idref=\'timeTraitSet\'/>\n 	  <taxaTypes idref=\'typeTraitSet\'/>\n   </endInfectionsTraitSet>\n\n")
 
 #start infectability
 xml.write("   <startInfectionsTraitSet spec=\'InfectionTraitSet\' id=\'startInfectionsTraitSet\' type=\'start\' traitname=\"date-forward\" value=\"")
-dL=list(hostT.keys())
-for s in dL:
-    xml.write(s+"="+str(hostT[s][0]))
-    if s!=dL[len(dL)-1]:
-        xml.write(",")
+xml.write(",".join([h+"="+str(hostT[h][0]) for h in hostT]))
 xml.write("\">\n 	  <taxaDates idref=\'timeTraitSet\'/>\n 	  <taxaTypes idref=\'typeTraitSet\'/>\n   </startInfectionsTraitSet>\n\n")
+xml.close()
+for opts in runs[1:]:
+    shutil.copyfile(runs[0].output+".xml",opts.output+".xml")
 
-#check that times fit
-for s in seqs.keys():
-    h=hosts[s]
-    if dates[s]<=hostT[hosts[s]][0]:
-        print("Error, sampling time "+str(dates[s])+" of sample "+s+" must be after start of infectability time "+str(hostT[hosts[s]][0])+" of host "+h)
-        exit()
-    if dates[s]>=hostT[hosts[s]][1]:
-        print("Error, sampling time "+str(dates[s])+" of sample "+s+" must be before end of infectiousness time "+str(hostT[hosts[s]][0])+" of host "+h)
-        exit()
-
-#include mutation model
-xml.write("   <siteModel spec=\"SiteModel\" id=\"siteModel\">\n     <mutationRate spec=\'RealParameter\' id=\"mutationRate\" value=\"1.0\"/>\n     <substModel spec=\"")
-if args.mutationModel=="HKY":
-   xml.write("HKY\">\n       <kappa spec=\'RealParameter\' id=\"hky.kappa\" value=\"1.0\"/>\n")
-elif args.mutationModel=="JC":
-   xml.write("jc69\">\n")
-elif args.mutationModel=="GTR":
-   xml.write("GTR\" rateAC=\"@rateAC\" rateAG=\"@rateAG\" rateAT=\"@rateAT\" rateCG=\"@rateCG\" rateGT=\"@rateGT\" >\n       <parameter estimate=\'false\' name=\"rateCT\" lower=\"0.0\" value=\"1.0\" id=\"rateCTfixed\"/>\n")
-else:
-    print("Error, mutation model "+args.mutationModel+" not recognized.")
-    exit()
-xml.write("       <frequencies estimate=\"false\" spec=\'Frequencies\'>\n	 <frequencies spec=\'RealParameter\' id=\""+args.mutationModel+".freq\" value=\"0.25 0.25 0.25 0.25\"/>\n       </frequencies>\n     </substModel>\n   </siteModel>\n\n")
-              
-#migration model
+#number of hosts and mean length of their infectious periods, the same for all analyses
 nHos=len(hostT.keys())
 meanL=0.0
 for h in hostT.keys():
     meanL+=hostT[h][1]-hostT[h][0]
 meanL=meanL/len(hostT.keys())
-ma=args.maxHosts
-if ma<nHos:
-    ma=nHos+5
-    print("Maximum number of hosts specified is less than the minimum number of hosts. Setting it to "+str(ma))
-if ma<(nHos+2):
-    print("Warning: the maximum number of hosts is less than "+str(nHos+2)+". If there are problems in the execution of the BEAST2 analysis, try a higher values of maxHosts.")
-start=int((nHos+ma)/2)
-if start<(nHos+2) and ma>=(nHos+2):
-    start=nHos+2
-xml.write("   <migrationModelUniform spec=\'MigrationModelUniform\' id=\'migModel\' minDemes=\'"+str(nHos)+"\'>\n     <rate spec=\'RealParameter\' value=\""+str(1.0/(meanL*nHos))+"\" dimension=\"1\" id=\"rate\"/>\n     <popSize spec=\'RealParameter\' value=\"1.0\" dimension=\"1\" id=\"popSize\"/>\n     <numDemes spec=\'IntegerParameter\' value=\""+str(start)+"\" dimension=\"1\" id=\"numDemes\" lower=\'"+str(nHos)+"\' upper=\'"+str(ma)+"\'/>\n     <trait idref=\'startInfectionsTraitSet\' type=\'start\'/>\n     <trait idref=\'endInfectionsTraitSet\' type=\'end\'/>\n   </migrationModelUniform>\n\n")            
-
-#priors
-xml.write("   <input spec=\'CompoundDistribution\' id=\'parameterPriors\'>\n     <distribution spec=\'beast.math.distributions.Prior\' x=\"@mutationRate\">\n       <distr spec=\'LogNormalDistributionModel\' M=\"-3.0\" S=\"6.0\"/>\n     </distribution>\n     <distribution spec=\'beast.math.distributions.Prior\' x=\"@popSize\">\n       <distr spec=\"LogNormalDistributionModel\"  M=\"0.0\" S=\"6.0\"/>\n     </distribution>\n     <distribution spec=\'beast.math.distributions.Prior\' x=\"@rate\">\n       <distr spec=\'LogNormalDistributionModel\' M=\""+str(math.log(1.0/(meanL*nHos)))+"\" S=\"0.2\"/>\n     </distribution>\n")
-if args.mutationModel=="HKY":
-    xml.write("     <distribution spec=\'beast.math.distributions.Prior\' x=\"@hky.kappa\">\n       <distr spec=\'LogNormalDistributionModel\' M=\"0.0\" S=\"4.0\"/>\n     </distribution>\n   </input>\n\n")
-elif args.mutationModel=="JC":
-   xml.write("   </input>\n\n")
-elif args.mutationModel=="GTR":
-    xml.write("     <distribution spec=\'beast.math.distributions.Prior\' x=\"@rateAC\">\n       <distr spec=\'LogNormalDistributionModel\' M=\"0.0\" S=\"4.0\"/>\n     </distribution>\n     <distribution spec=\'beast.math.distributions.Prior\' x=\"@rateAG\">\n       <distr spec=\'LogNormalDistributionModel\' M=\"0.0\" S=\"4.0\"/>\n     </distribution>\n     <distribution spec=\'beast.math.distributions.Prior\' x=\"@rateAT\">\n       <distr spec=\'LogNormalDistributionModel\' M=\"0.0\" S=\"4.0\"/>\n     </distribution>\n     <distribution spec=\'beast.math.distributions.Prior\' x=\"@rateCG\">\n       <distr spec=\'LogNormalDistributionModel\' M=\"0.0\" S=\"4.0\"/>\n     </distribution>\n     <distribution spec=\'beast.math.distributions.Prior\' x=\"@rateGT\">\n       <distr spec=\'LogNormalDistributionModel\' M=\"0.0\" S=\"4.0\"/>\n     </distribution>\n   </input>\n\n")      
+
+
+#write the model and the MCMC of an analysis, after its data
+def writeModel(xml,opts):
+    # logging frequency
+    tracelog  = opts.tracelog  if opts.tracelog  > 0 else int(opts.numIter/10000)
+    screenlog = opts.screenlog if opts.screenlog > 0 else int(opts.numIter/5000)
+    treelog   = opts.treelog   if opts.treelog   > 0 else int(opts.numIter/1000)
+
+    #include mutation model
+    xml.write("   <siteModel spec=\"SiteModel\" id=\"siteModel\">\n     <mutationRate spec=\'RealParameter\' id=\"mutationRate\" value=\"1.0\"/>\n     <substModel spec=\"")
+    if opts.mutationModel=="HKY":
+       xml.write("HKY\">\n       <kappa spec=\'RealParameter\' id=\"hky.kappa\" value=\"1.0\"/>\n")
+    elif opts.mutationModel=="JC":
+       xml.write("jc69\">\n")
+    elif opts.mutationModel=="GTR":
+       xml.write("GTR\" rateAC=\"@rateAC\" rateAG=\"@rateAG\" rateAT=\"@rateAT\" rateCG=\"@rateCG\" rateGT=\"@rateGT\" >\n       <parameter estimate=\'false\' name=\"rateCT\" lower=\"0.0\" value=\"1.0\" id=\"rateCTfixed\"/>\n")
+    else:
+        print("Error, mutation model "+opts.mutationModel+" not recognized.")
+        exit()
+    xml.write("       <frequencies estimate=\"false\" spec=\'Frequencies\'>\n	 <frequencies spec=\'RealParameter\' id=\""+opts.mutationModel+".freq\" value=\"0.25 0.25 0.25 0.25\"/>\n       </frequencies>\n     </substModel>\n   </siteModel>\n\n")
+              
+    #migration model
+    ma=opts.maxHosts
+    if ma<nHos:
+        ma=nHos+5
+        print("Maximum number of hosts specified is less than the minimum number of hosts. Setting it to "+str(ma))
+    if ma<(nHos+2):
+        print("Warning: the maximum number of hosts is less than "+str(nHos+2)+". If there are problems in the execution of the BEAST2 analysis, try a higher values of maxHosts.")
+    start=int((nHos+ma)/2)
+    if start<(nHos+2) and ma>=(nHos+2):
+        start=nHos+2
+    xml.write("   <migrationModelUniform spec=\'MigrationModelUniform\' id=\'migModel\' minDemes=\'"+str(nHos)+"\'>\n     <rate spec=\'RealParameter\' value=\""+str(1.0/(meanL*nHos))+"\" dimension=\"1\" id=\"rate\"/>\n     <popSize spec=\'RealParameter\' value=\"1.0\" dimension=\"1\" id=\"popSize\"/>\n     <numDemes spec=\'IntegerParameter\' value=\""+str(start)+"\" dimension=\"1\" id=\"numDemes\" lower=\'"+str(nHos)+"\' upper=\'"+str(ma)+"\'/>\n     <trait idref=\'startInfectionsTraitSet\' type=\'start\'/>\n     <trait idref=\'endInfectionsTraitSet\' type=\'end\'/>\n   </migrationModelUniform>\n\n")            
+
+    #priors
+    xml.write("   <input spec=\'CompoundDistribution\' id=\'parameterPriors\'>\n     <distribution spec=\'beast.math.distributions.Prior\' x=\"@mutationRate\">\n       <distr spec=\'LogNormalDistributionModel\' M=\"-3.0\" S=\"6.0\"/>\n     </distribution>\n     <distribution spec=\'beast.math.distributions.Prior\' x=\"@popSize\">\n       <distr spec=\"LogNormalDistributionModel\"  M=\"0.0\" S=\"6.0\"/>\n     </distribution>\n     <distribution spec=\'beast.math.distributions.Prior\' x=\"@rate\">\n       <distr spec=\'LogNormalDistributionModel\' M=\""+str(math.log(1.0/(meanL*nHos)))+"\" S=\"0.2\"/>\n     </distribution>\n")
+    if opts.mutationModel=="HKY":
+        xml.write("     <distribution spec=\'beast.math.distributions.Prior\' x=\"@hky.kappa\">\n       <distr spec=\'LogNormalDistributionModel\' M=\"0.0\" S=\"4.0\"/>\n     </distribution>\n   </input>\n\n")
+    elif opts.mutationModel=="JC":
+       xml.write("   </input>\n\n")
+    elif opts.mutationModel=="GTR":
+        xml.write("     <distribution spec=\'beast.math.distributions.Prior\' x=\"@rateAC\">\n       <distr spec=\'LogNormalDistributionModel\' M=\"0.0\" S=\"4.0\"/>\n     </distribution>\n     <distribution spec=\'beast.math.distributions.Prior\' x=\"@rateAG\">\n       <distr spec=\'LogNormalDistributionModel\' M=\"0.0\" S=\"4.0\"/>\n     </distribution>\n     <distribution spec=\'beast.math.distributions.Prior\' x=\"@rateAT\">\n       <distr spec=\'LogNormalDistributionModel\' M=\"0.0\" S=\"4.0\"/>\n     </distribution>\n     <distribution spec=\'beast.math.distributions.Prior\' x=\"@rateCG\">\n       <distr spec=\'LogNormalDistributionModel\' M=\"0.0\" S=\"4.0\"/>\n     </distribution>\n     <distribution spec=\'beast.math.distributions.Prior\' x=\"@rateGT\">\n       <distr spec=\'LogNormalDistributionModel\' M=\"0.0\" S=\"4.0\"/>\n     </distribution>\n   </input>\n\n")      
               
-#Likelihoods
-xml.write("<input spec=\'TreeLikelihood\' id=\"treeLikelihood\">\n     <data idref=\"alignment\"/>\n     <tree idref=\"tree\"/>\n     <siteModel idref=\'siteModel\'/>\n   </input>\n\n   <input spec=\'StructuredCoalescentTreeDensityNew\' id=\'treePrior\' limitedLifespan=\'"+str(args.unlimLife)+"\' penalizeMigration=\'"+str(args.penalizeMigration)+"\'>\n     <multiTypeTreeConcise idref=\"tree\"/>\n     <migrationModelUniform idref=\"migModel\"/>\n   </input>\n\n   <run spec=\"MCMC\" id=\"mcmc\" chainLength=\""+str(args.numIter)+"\" storeEvery=\"10000\">\n\n")
+    #Likelihoods
+    xml.write("<input spec=\'TreeLikelihood\' id=\"treeLikelihood\">\n     <data idref=\"alignment\"/>\n     <tree idref=\"tree\"/>\n     <siteModel idref=\'siteModel\'/>\n   </input>\n\n   <input spec=\'StructuredCoalescentTreeDensityNew\' id=\'treePrior\' limitedLifespan=\'"+str(opts.unlimLife)+"\' penalizeMigration=\'"+str(opts.penalizeMigration)+"\'>\n     <multiTypeTreeConcise idref=\"tree\"/>\n     <migrationModelUniform idref=\"migModel\"/>\n   </input>\n\n   <run spec=\"MCMC\" id=\"mcmc\" chainLength=\""+str(opts.numIter)+"\" storeEvery=\"10000\">\n\n")
 
-#migration model
-xml.write("     <init spec=\'StructuredCoalescentMultiTypeTreeConcise\' id=\'tree\' nTypes=\""+str(start)+"\">\n         <migrationModelUniform spec=\'MigrationModelUniform\' minDemes=\'"+str(nHos)+"\'>\n             <rate spec=\'RealParameter\' value=\""+str(1.0/(meanL*nHos))+"\" dimension=\"1\"/>\n             <popSize spec=\'RealParameter\' value=\"1.0\" dimension=\"1\"/>\n             <numDemes spec=\'IntegerParameter\' value=\""+str(start)+"\" dimension=\"1\"/>\n         </migrationModelUniform>\n         <trait idref=\'typeTraitSet\'/>\n         <trait idref=\'timeTraitSet\'/>\n     </init>\n\n")              
+    #migration model
+    xml.write("     <init spec=\'StructuredCoalescentMultiTypeTreeConcise\' id=\'tree\' nTypes=\""+str(start)+"\">\n         <migrationModelUniform spec=\'MigrationModelUniform\' minDemes=\'"+str(nHos)+"\'>\n             <rate spec=\'RealParameter\' value=\""+str(1.0/(meanL*nHos))+"\" dimension=\"1\"/>\n             <popSize spec=\'RealParameter\' value=\"1.0\" dimension=\"1\"/>\n             <numDemes spec=\'IntegerParameter\' value=\""+str(start)+"\" dimension=\"1\"/>\n         </migrationModelUniform>\n         <trait idref=\'typeTraitSet\'/>\n         <trait idref=\'timeTraitSet\'/>\n     </init>\n\n")              
               
-#state nodes              
-xml.write("     <state>\n       <stateNode idref=\"tree\"/>\n       <stateNode idref=\"rate\"/>\n       <stateNode idref=\"popSize\"/>\n       <stateNode idref=\"numDemes\"/>\n       <stateNode idref=\"mutationRate\"/>\n")
-if args.mutationModel=="HKY":
-    xml.write("       <stateNode idref=\"hky.kappa\"/>\n")
-elif args.mutationModel=="GTR":              
-    xml.write("       <stateNode idref=\"rateAC\"/>\n       <stateNode idref=\"rateAG\"/>\n       <stateNode idref=\"rateAT\"/>\n       <stateNode idref=\"rateCG\"/>\n       <stateNode idref=\"rateGT\"/>\n")
-xml.write("       <stateNode idref=\""+args.mutationModel+".freq\"/>\n     </state>\n\n")     
+    #state nodes              
+    xml.write("     <state>\n       <stateNode idref=\"tree\"/>\n       <stateNode idref=\"rate\"/>\n       <stateNode idref=\"popSize\"/>\n       <stateNode idref=\"numDemes\"/>\n       <stateNode idref=\"mutationRate\"/>\n")
+    if opts.mutationModel=="HKY":
+        xml.write("       <stateNode idref=\"hky.kappa\"/>\n")
+    elif opts.mutationModel=="GTR":              
+        xml.write("       <stateNode idref=\"rateAC\"/>\n       <stateNode idref=\"rateAG\"/>\n       <stateNode idref=\"rateAT\"/>\n       <stateNode idref=\"rateCG\"/>\n       <stateNode idref=\"rateGT\"/>\n")
+    xml.write("       <stateNode idref=\""+opts.mutationModel+".freq\"/>\n     </state>\n\n")     
               
-#compound distribution
-xml.write("     <distribution spec=\'CompoundDistribution\' id=\'posterior\'>\n       <distribution idref=\"treeLikelihood\"/>\n       <distribution idref=\'treePrior\'/>\n       <distribution idref=\"parameterPriors\"/>\n     </distribution>\n\n")
+    #compound distribution
+    xml.write("     <distribution spec=\'CompoundDistribution\' id=\'posterior\'>\n       <distribution idref=\"treeLikelihood\"/>\n       <distribution idref=\'treePrior\'/>\n       <distribution idref=\"parameterPriors\"/>\n     </distribution>\n\n")
               
-#operators
-xml.write("     <operator spec=\'ScaleOperator\' id=\'RateScaler\' parameter=\"@rate\" scaleFactor=\"0.8\" weight=\"1\"/>\n     <operator spec=\"ScaleOperator\" id=\"PopSizeScaler\" parameter=\"@popSize\" scaleFactor=\"0.8\" weight=\"1\"/>\n     <operator spec=\"ShortRangeUniformOperator\" id=\"NumDemesScaler\" parameter=\"@numDemes\" weight=\"1\"/>\n     <operator spec=\"ScaleOperator\" id=\"muRateScaler\" parameter=\"@mutationRate\" scaleFactor=\"0.8\" weight=\"1\"/>\n     <operator spec=\"DeltaExchangeOperator\" id=\"freqExchanger\" parameter=\"@"+args.mutationModel+".freq\" delta=\"0.01\" weight=\"0.1\"/>\n     <operator id=\'treeScaler.t\' spec=\'ScaleOperator\' scaleFactor=\"0.5\" weight=\"3\" tree=\"@tree\"/>\n     <operator id=\'treeRootScaler.t\' spec=\'ScaleOperator\' scaleFactor=\"0.5\" weight=\"3\" tree=\"@tree\" rootOnly=\'true\'/>\n     <operator id=\'UniformOperator.t\' spec=\'Uniform\' weight=\"30\" tree=\"@tree\"/>\n     <operator id=\'SubtreeSlide.t\' spec=\'SubtreeSlide\' weight=\"15\" gaussian=\"true\" size=\"1.0\" tree=\"@tree\"/>\n     <operator id=\'narrow.t\' spec=\'Exchange\' isNarrow=\'true\' weight=\"15\" tree=\"@tree\"/>\n     <operator id=\'wide.t\' spec=\'Exchange\' isNarrow=\'false\' weight=\"3\" tree=\"@tree\"/>\n     <operator id=\'WilsonBalding.t\' spec=\'WilsonBalding\' weight=\"3\" tree=\"@tree\"/>\n")
-if args.mutationModel=="HKY":
-    xml.write("     <operator spec=\'ScaleOperator\' id=\'kappaScaler\' parameter=\"@hky.kappa\" scaleFactor=\"0.8\" weight=\"0.1\"/>\n")
-elif args.mutationModel=="GTR": 
-    xml.write("     <operator spec=\'ScaleOperator\' id=\'ACScaler\' parameter=\"@rateAC\" scaleFactor=\"0.8\" weight=\"0.1\"/>\n     <operator spec=\'ScaleOperator\' id=\'AGScaler\' parameter=\"@rateAG\" scaleFactor=\"0.8\" weight=\"0.1\"/>\n     <operator spec=\'ScaleOperator\' id=\'ATScaler\' parameter=\"@rateAT\" scaleFactor=\"0.8\" weight=\"0.1\"/>\n     <operator spec=\'ScaleOperator\' id=\'CGScaler\' parameter=\"@rateCG\" scaleFactor=\"0.8\" weight=\"0.1\"/>\n     <operator spec=\'ScaleOperator\' id=\'GTScaler\' parameter=\"@rateGT\" scaleFactor=\"0.8\" weight=\"0.1\"/>\n")
-xml.write("\n")
-
-#loggers
-xml.write("     <logger logEvery=\""+str(tracelog)+"\" fileName=\""+args.output+".log\">\n       <model idref=\'posterior\'/>\n       <log idref=\"posterior\"/>       <log idref=\"treeLikelihood\"/>\n       <log idref=\"migModel\"/>\n       <log idref=\"mutationRate\"/>\n       <log spec=\'TreeHeightLogger\' tree=\'@tree\'/>\n       <log idref=\""+args.mutationModel+".freq\"/>\n")
-if args.mutationModel=="HKY":
-    xml.write("       <log idref=\"hky.kappa\"/>\n")
-elif args.mutationModel=="GTR":               
-    xml.write("       <log idref=\"rateAC\"/>\n       <log idref=\"rateAG\"/>\n       <log idref=\"rateAT\"/>\n       <log idref=\"rateCG\"/>\n       <log idref=\"rateGT\"/>\n")
-xml.write("     </logger>\n")
+    #operators
+    xml.write("     <operator spec=\'ScaleOperator\' id=\'RateScaler\' parameter=\"@rate\" scaleFactor=\"0.8\" weight=\"1\"/>\n     <operator spec=\"ScaleOperator\" id=\"PopSizeScaler\" parameter=\"@popSize\" scaleFactor=\"0.8\" weight=\"1\"/>\n     <operator spec=\"ShortRangeUniformOperator\" id=\"NumDemesScaler\" parameter=\"@numDemes\" weight=\"1\"/>\n     <operator spec=\"ScaleOperator\" id=\"muRateScaler\" parameter=\"@mutationRate\" scaleFactor=\"0.8\" weight=\"1\"/>\n     <operator spec=\"DeltaExchangeOperator\" id=\"freqExchanger\" parameter=\"@"+opts.mutationModel+".freq\" delta=\"0.01\" weight=\"0.1\"/>\n     <operator id=\'treeScaler.t\' spec=\'ScaleOperator\' scaleFactor=\"0.5\" weight=\"3\" tree=\"@tree\"/>\n     <operator id=\'treeRootScaler.t\' spec=\'ScaleOperator\' scaleFactor=\"0.5\" weight=\"3\" tree=\"@tree\" rootOnly=\'true\'/>\n     <operator id=\'UniformOperator.t\' spec=\'Uniform\' weight=\"30\" tree=\"@tree\"/>\n     <operator id=\'SubtreeSlide.t\' spec=\'SubtreeSlide\' weight=\"15\" gaussian=\"true\" size=\"1.0\" tree=\"@tree\"/>\n     <operator id=\'narrow.t\' spec=\'Exchange\' isNarrow=\'true\' weight=\"15\" tree=\"@tree\"/>\n     <operator id=\'wide.t\' spec=\'Exchange\' isNarrow=\'false\' weight=\"3\" tree=\"@tree\"/>\n     <operator id=\'WilsonBalding.t\' spec=\'WilsonBalding\' weight=\"3\" tree=\"@tree\"/>\n")
+    if opts.mutationModel=="HKY":
+        xml.write("     <operator spec=\'ScaleOperator\' id=\'kappaScaler\' parameter=\"@hky.kappa\" scaleFactor=\"0.8\" weight=\"0.1\"/>\n")
+    elif opts.mutationModel=="GTR": 
+        xml.write("     <operator spec=\'ScaleOperator\' id=\'ACScaler\' parameter=\"@rateAC\" scaleFactor=\"0.8\" weight=\"0.1\"/>\n     <operator spec=\'ScaleOperator\' id=\'AGScaler\' parameter=\"@rateAG\" scaleFactor=\"0.8\" weight=\"0.1\"/>\n     <operator spec=\'ScaleOperator\' id=\'ATScaler\' parameter=\"@rateAT\" scaleFactor=\"0.8\" weight=\"0.1\"/>\n     <operator spec=\'ScaleOperator\' id=\'CGScaler\' parameter=\"@rateCG\" scaleFactor=\"0.8\" weight=\"0.1\"/>\n     <operator spec=\'ScaleOperator\' id=\'GTScaler\' parameter=\"@rateGT\" scaleFactor=\"0.8\" weight=\"0.1\"/>\n")
+    xml.write("\n")
+
+    #loggers
+    xml.write("     <logger logEvery=\""+str(tracelog)+"\" fileName=\""+opts.output+".log\">\n       <model idref=\'posterior\'/>\n       <log idref=\"posterior\"/>       <log idref=\"treeLikelihood\"/>\n       <log idref=\"migModel\"/>\n       <log idref=\"mutationRate\"/>\n       <log spec=\'TreeHeightLogger\' tree=\'@tree\'/>\n       <log idref=\""+opts.mutationModel+".freq\"/>\n")
+    if opts.mutationModel=="HKY":
+        xml.write("       <log idref=\"hky.kappa\"/>\n")
+    elif opts.mutationModel=="GTR":               
+        xml.write("       <log idref=\"rateAC\"/>\n       <log idref=\"rateAG\"/>\n       <log idref=\"rateAT\"/>\n       <log idref=\"rateCG\"/>\n       <log idref=\"rateGT\"/>\n")
+    xml.write("     </logger>\n")
      
-xml.write("     <logger logEvery=\""+str(treelog)+"\" fileName=\""+args.output+".trees\" mode=\"tree\">\n       <log idref=\'treePrior\'/>\n     </logger>\n")
+    xml.write("     <logger logEvery=\""+str(treelog)+"\" fileName=\""+opts.output+".trees\" mode=\"tree\">\n       <log idref=\'treePrior\'/>\n     </logger>\n")
+
+    xml.write("     <logger logEvery=\""+str(screenlog)+"\">\n       <model idref=\'posterior\'/>\n       <log idref=\"posterior\"/>\n       <log idref=\"treeLikelihood\"/>\n       <log spec=\'TreeHeightLogger\' tree=\'@tree\'/>\n       <log idref=\"migModel\"/>\n       <log idref=\"mutationRate\"/>\n       <ESS spec=\'ESS\' name=\'log\' arg=\"@treePrior\"/>\n       <ESS spec=\'ESS\' name=\'log\' arg=\"@posterior\"/>\n     </logger>\n\n   </run>\n </beast>\n\n")
+
 
-xml.write("     <logger logEvery=\""+str(screenlog)+"\">\n       <model idref=\'posterior\'/>\n       <log idref=\"posterior\"/>\n       <log idref=\"treeLikelihood\"/>\n       <log spec=\'TreeHeightLogger\' tree=\'@tree\'/>\n       <log idref=\"migModel\"/>\n       <log idref=\"mutationRate\"/>\n       <ESS spec=\'ESS\' name=\'log\' arg=\"@treePrior\"/>\n       <ESS spec=\'ESS\' name=\'log\' arg=\"@posterior\"/>\n     </logger>\n\n   </run>\n </beast>\n\n")
+for opts in runs:
+    if len(runs)>1:
+        print("Writing "+opts.output+".xml")
+    xml=open(opts.output+".xml","a")
+    writeModel(xml,opts)
+    xml.close()
 
 
 
@@ -0,0 +1,131 @@
+# Benchmark the summary of SCOTTI trees files on synthetic data
+#
+# A synthetic trees file is generated (the same one for the same options), then
+# summarised in this process phase by phase (finding the burnin, parsing, counting
+# and writing the network file), and then by running Make_transmission_tree.py and
+# Make_transmission_tree_alternative.py on it without plots.
+# Reported are the time of each phase, trees per second and peak memory (RSS).
+
+import sys
+import os
+import time
+import json
+import resource
+import argparse
+import subprocess
+
+from scotti_tools import writeNetwork, countTrees, treeOffset, readTreeOffsets, parseTree, TransmissionCounts, writeSyntheticTrees, BATCH_TREES
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--tips',"-t", help='number of samples in each tree (default 100).', type=int, default=100)
+parser.add_argument('--numHosts',"-nH", help='number of sampled hosts (default 20).', type=int, default=20)
+parser.add_argument('--trees',"-n", help='number of trees in the file (default 1000).', type=int, default=1000)
+parser.add_argument('--unsampled',"-u", help='probability that an internal node is in an unsampled host (default 0.2).', type=float, default=0.2)
+parser.add_argument('--seed',"-s", help='seed of the synthetic trees (default 1).', type=int, default=1)
+parser.add_argument('--burnin',"-b", help='percentage of trees to discard (default 20).', type=int, default=20)
+parser.add_argument('--directory',"-d", help='directory for the synthetic trees and the output files (default \"benchmark\").', default="benchmark")
+parser.add_argument('--results',"-r", help='optional file to which the results are appended, one JSON record per benchmark.', default="")
+parser.add_argument('--noScripts', '-nS', dest='runScripts', help='only time the phases, do not run the two scripts.', action='store_false')
+parser.set_defaults(runScripts=True)
+
+args = parser.parse_args()
+
+
+## peak RSS in MB from a resource usage (ru_maxrss is in kB on Linux, bytes on macOS)
+def peakMB(usage):
+	if sys.platform=="darwin":
+		return usage.ru_maxrss/1024.0/1024.0
+	return usage.ru_maxrss/1024.0
+
+
+## Run a script on the trees file, returns its time, peak RSS and exit status
+def runScript(script,inputF,outputF,burnin):
+	logName=outputF+".log"
+	logF=open(logName,"w")
+	start=time.perf_counter()
+	process=subprocess.Popen([sys.executable,script,"-i",inputF,"-o",outputF,"-b",str(burnin),"-nPD","-nPI","-nRI"],stdout=logF,stderr=subprocess.STDOUT)
+	pid,status,usage=os.wait4(process.pid,0)
+	seconds=time.perf_counter()-start
+	# the process was waited for here, not by subprocess
+	process.returncode=os.waitstatus_to_exitcode(status)
+	logF.close()
+	return {"seconds":seconds,"peakMB":peakMB(usage),"status":process.returncode,"log":logName}
+
+
+if not os.path.isdir(args.directory):
+	os.makedirs(args.directory)
+name="synthetic_t"+str(args.tips)+"_h"+str(args.numHosts)+"_n"+str(args.trees)+"_u"+str(args.unsampled)+"_s"+str(args.seed)
+inputF=os.path.join(args.directory,name+".trees")
+if not os.path.isfile(inputF):
+	print("Generating "+inputF)
+	start=time.perf_counter()
+	writeSyntheticTrees(inputF,args.tips,args.numHosts,args.trees,args.unsampled,args.seed)
+	print("Generated in "+"%.2f" % (time.perf_counter()-start)+" s")
+sizeMB=os.path.getsize(inputF)/1024.0/1024.0
+
+## Summarise in this process, timing each phase
+phases={}
+start=time.perf_counter()
+totTrees=countTrees(inputF)
+burned=int((float(args.burnin)/100)*totTrees)
+offset=treeOffset(inputF,burned)
+phases["burnin"]=time.perf_counter()-start
+
+counts=TransmissionCounts()
+phases["read"]=0.0
+phases["parse"]=0.0
+phases["count"]=0.0
+tables=[]
+start=time.perf_counter()
+for offset,state,tree in readTreeOffsets(inputF,offset):
+	parsed=time.perf_counter()
+	phases["read"]+=parsed-start
+	tables.append(parseTree(tree,counts.hostIndex))
+	start=time.perf_counter()
+	phases["parse"]+=start-parsed
+	if len(tables)==BATCH_TREES:
+		counts.addTrees(tables)
+		tables=[]
+		counted=time.perf_counter()
+		phases["count"]+=counted-start
+		start=counted
+phases["read"]+=time.perf_counter()-start
+start=time.perf_counter()
+counts.addTrees(tables)
+phases["count"]+=time.perf_counter()-start
+
+start=time.perf_counter()
+directTrans,indirectTrans,roots,totOrigins=counts.ordered()
+writeNetwork(os.path.join(args.directory,name+"_phases_network.txt"),counts.hosts,counts.numTrees,directTrans,indirectTrans,roots,totOrigins)
+phases["write"]=time.perf_counter()-start
+
+total=sum(phases.values())
+record={"file":inputF,"sizeMB":sizeMB,"tips":args.tips,"numHosts":args.numHosts,"trees":totTrees,"summarised":counts.numTrees,"unsampled":args.unsampled,"seed":args.seed,
+	"phases":phases,"seconds":total,"treesPerSecond":counts.numTrees/total if total>0 else None,"peakMB":peakMB(resource.getrusage(resource.RUSAGE_SELF)),"scripts":{}}
+
+print("\n"+inputF+": "+str(totTrees)+" trees of "+str(args.tips)+" samples, "+"%.1f" % sizeMB+" MB, "+str(counts.numTrees)+" trees summarised\n")
+print("Phases in this process:")
+for phase in ("burnin","read","parse","count","write"):
+	print("  %-8s %9.3f s  %5.1f%%" % (phase,phases[phase],100*phases[phase]/total if total>0 else 0))
+print("  %-8s %9.3f s  %.1f trees/s, peak RSS %.1f MB" % ("total",total,record["treesPerSecond"] or 0,record["peakMB"]))
+
+## Run both scripts on the same file
+if args.runScripts:
+	print("\nScripts (without plots):")
+	directory=os.path.dirname(os.path.abspath(__file__))
+	for script in ("Make_transmission_tree.py","Make_transmission_tree_alternative.py"):
+		outputF=os.path.join(args.directory,name+"_"+script[:-3])
+		result=runScript(os.path.join(directory,script),inputF,outputF,args.burnin)
+		record["scripts"][script]=result
+		if result["status"]!=0:
+			print("  %-40s failed with exit status %d, see %s" % (script,result["status"],result["log"]))
+		else:
+			result["treesPerSecond"]=counts.numTrees/result["seconds"]
+			print("  %-40s %9.3f s  %.1f trees/s, peak RSS %.1f MB" % (script,result["seconds"],result["treesPerSecond"],result["peakMB"]))
+
+if args.results!="":
+	resultsF=open(args.results,"a")
+	resultsF.write(json.dumps(record)+"\n")
+	resultsF.close()
+	print("\nResults appended to "+args.results)
@@ -0,0 +1,22 @@
+# Shared tools for the SCOTTI tutorial scripts
+
+from .hosts import HostIndex, UNSAMPLED, readHostsCsv, sampledHosts
+from .newick import NodeTable, TreeFormatError, decodeAnnotation, parseTree
+from .transmissions import DOUBLE_ORIGIN, findNewHosts
+from .treesfile import countTrees, readTrees, treeOffset, splitTrees, readTreeOffsets, readTreeRange, readTreeStates, treesBeforeState, readTreesAt, readTranslate
+from .edges import EdgeCounts, EdgeList
+from .counts import LENGTH_BINS, TransmissionCounts
+from .batch import BATCH_TREES, stackTables, countBatch, countTreeRange, countTreesAt
+from .parallel import summariseChunk, summariseOffsets, summariseParallel
+from .cache import CACHE_VERSION, cacheDir, cacheIsCurrent, buildCache, TreeCache, openCache
+from .output import writeNetwork, summaryTables, writeTablesCsv, writeSummaryJson
+from .checkpoint import CHECKPOINT_VERSION, saveCheckpoint, loadCheckpoint
+from .selection import TreeSelection, parseStateRange
+from .summary import TransmissionSummary, summariseTrees
+from .render import RenderError, Renderer, GraphToolRenderer, DotRenderer, MatplotlibRenderer, RENDERERS, getRenderer
+from .follow import TreesFollower
+from .synthetic import writeSyntheticTrees
+from .fasta import FastaFormatError, FastaIndex, constantSites, selectSites
+from .samples import UNLIMITED_TIMES, readCsvRows, SampleInputs
+from .sweep import SWEEP_SETTINGS, parseGridOption, parseGrid, gridSettings, sweepName
+from .tracelog import MSER_BATCH, TraceLogError, TraceLog, autocorrelation, effectiveSampleSize, stationaryStart
@@ -0,0 +1,166 @@
+# Count the transmissions of many trees at once with array operations
+#
+# The trees are stacked in the format of the cache (see scotti_tools.cache): the
+# parent (within its tree, -1 for the root), host id and numTransmissions of every
+# node of every tree, in pre-order, and the offset of the first node of each tree
+# followed by the total number of nodes.
+#
+# Each node gets the host and the number of transmissions that are passed down to
+# its children: the ones of its parent if there is no transmission above it, the
+# accumulated number of transmissions through Unsampled hosts, or its own host
+# otherwise. A sampled node with transmissions above it is a direct transmission
+# from the passed host if there is one transmission, an indirect one otherwise.
+# Only the first transmission (direct or indirect) between two hosts is counted in
+# each tree.
+
+import numpy as np
+
+from .hosts import UNSAMPLED
+from .newick import TreeFormatError, parseTree
+from .treesfile import readTreeRange, readTreesAt
+from .transmissions import DOUBLE_ORIGIN
+from .batchmeans import rootKey
+
+
+## number of trees counted together by the callers of countBatch
+BATCH_TREES=250
+
+
+## stack the node tables of several trees into arrays for countBatch
+def stackTables(tables):
+	parent=[]
+	host=[]
+	numTrans=[]
+	offsets=[0]
+	for table in tables:
+		parent.extend(table.parent)
+		host.extend(table.host)
+		numTrans.extend(table.numTrans)
+		offsets.append(len(parent))
+	return np.array(parent,dtype=np.int64),np.array(host,dtype=np.int64),np.array(numTrans,dtype=np.int64),np.array(offsets,dtype=np.int64)
+
+
+## sorted distinct values of an array
+def distinct(values):
+	values=np.sort(values)
+	if len(values)==0:
+		return values
+	keep=np.empty(len(values),dtype=bool)
+	keep[0]=True
+	np.not_equal(values[1:],values[:-1],out=keep[1:])
+	return values[keep]
+
+
+## Host and number of transmissions passed down by each node to its children
+## (see the top of this file), for all nodes at once. Each node points
+## to its nearest ancestor (or itself) where the host is reset, that is the root or
+## a sampled node with transmissions above it, and the numTransmissions of the
+## nodes on the way (all Unsampled or without transmissions) are summed, doubling
+## the length of the jumps at every step.
+def passedStates(parent,host,numTrans,isRoot):
+	reset=isRoot|((numTrans>0)&(host!=UNSAMPLED))
+	jump=np.where(reset,np.arange(len(host)),parent)
+	passedTrans=np.where(reset,0,numTrans)
+	further=jump[jump]
+	while not np.array_equal(further,jump):
+		passedTrans=passedTrans+passedTrans[jump]
+		jump=further
+		further=jump[jump]
+	return host[jump],passedTrans
+
+
+## Add the transmissions of the stacked trees to counts (a TransmissionCounts whose
+## hostIndex the host ids refer to)
+def countBatch(counts,parent,host,numTrans,offsets):
+	parent=np.asarray(parent,dtype=np.int64)
+	host=np.asarray(host,dtype=np.int64)
+	numTrans=np.asarray(numTrans,dtype=np.int64)
+	offsets=np.asarray(offsets,dtype=np.int64)
+	numTrees=len(offsets)-1
+	if numTrees<=0:
+		return
+	counts.reserve(len(counts.hostIndex))
+	size=len(counts.roots)
+	if len(counts.known)+1<len(counts.hostIndex):
+		# new hosts, in the order in which they first appear
+		ids,first=np.unique(host,return_index=True)
+		for h in ids[np.argsort(first)].tolist():
+			if h!=UNSAMPLED and not (h in counts.known):
+				counts.known.add(h)
+				counts.hosts.append(counts.hostIndex.names[h])
+
+	# node indices over all trees
+	treeOf=np.repeat(np.arange(numTrees,dtype=np.int64),np.diff(offsets))
+	roots=offsets[:-1]
+	parent=parent+offsets[treeOf]
+	parent[roots]=roots
+	isRoot=np.zeros(len(host),dtype=bool)
+	isRoot[roots]=True
+	passedHost,passedTrans=passedStates(parent,host,numTrans,isRoot)
+	np.add.at(counts.roots,host[roots],1)
+
+	# host switches: sampled nodes with transmissions above them
+	events=np.nonzero((~isRoot)&(numTrans>0)&(host!=UNSAMPLED))[0]
+	child=host[events]
+	fromHost=passedHost[parent[events]]
+	length=numTrans[events]+passedTrans[parent[events]]
+	tree=treeOf[events]
+	sampled=fromHost!=UNSAMPLED
+	direct=sampled&(fromHost!=child)&(length==1)
+	itself=np.nonzero(sampled&(fromHost==child)&(length==1))[0]
+	if len(itself)>0:
+		raise TreeFormatError("there is a problem, this should not be 1: a single transmission from host "+counts.hostIndex.names[child[itself[0]]]+" to itself")
+
+	# only the first transmission (direct or indirect) between two hosts counts in each tree
+	pairs=np.nonzero(sampled)[0]
+	keys=(tree[pairs]*size+fromHost[pairs])*size+child[pairs]
+	first=pairs[np.unique(keys,return_index=True)[1]]
+	firstDirect=first[direct[first]]
+	firstIndirect=first[~direct[first]]
+	counts.directTrans.addArrays(fromHost[firstDirect],child[firstDirect])
+	counts.indirectTrans.addArrays(fromHost[firstIndirect],child[firstIndirect],np.minimum(length[firstIndirect]-2,counts.indirectTrans.width-1))
+
+	# origins: every sampled root or host switched into has one in its tree. It is
+	# Unsampled unless there were direct transmissions into the host, then it is
+	# their source, or doubleOrigin if they came from more than one host.
+	rootKeys=np.arange(numTrees,dtype=np.int64)*size+host[roots]
+	present=distinct(np.concatenate((rootKeys[host[roots]!=UNSAMPLED],tree*size+child)))
+	origin=np.full(len(present),UNSAMPLED,dtype=np.int64)
+	sources=distinct((tree[direct]*size+child[direct])*size+fromHost[direct])
+	received,firstSource,numSources=np.unique(sources//size,return_index=True,return_counts=True)
+	where=np.searchsorted(present,received)
+	origin[where]=np.where(numSources>1,DOUBLE_ORIGIN,sources[firstSource]%size)
+	hosts=present%size
+	double=origin==DOUBLE_ORIGIN
+	np.add.at(counts.doubleOrigins,hosts[double],1)
+	counts.totOrigins.addArrays(hosts[~double],origin[~double])
+	if counts.batchMeans!=None:
+		counts.batchMeans.addTrees(numTrees,{
+			"direct":(tree[firstDirect],(fromHost[firstDirect]<<32)|child[firstDirect]),
+			"indirect":(tree[firstIndirect],(fromHost[firstIndirect]<<32)|child[firstIndirect]),
+			"roots":(np.arange(numTrees),rootKey(host[roots]))})
+	counts.numTrees+=numTrees
+
+
+## parse and count the trees between offsets start and end of a trees file, BATCH_TREES at a time
+def countTreeRange(counts,fileName,start,end=None):
+	tables=[]
+	for state,tree in readTreeRange(fileName,start,end):
+		tables.append(parseTree(tree,counts.hostIndex))
+		if len(tables)==BATCH_TREES:
+			countBatch(counts,*stackTables(tables))
+			tables=[]
+	countBatch(counts,*stackTables(tables))
+	return counts
+
+
+## parse and count the trees at the given byte offsets of a trees file, BATCH_TREES at a time
+def countTreesAt(counts,fileName,offsets):
+	tables=[]
+	for state,tree in readTreesAt(fileName,offsets):
+		tables.append(parseTree(tree,counts.hostIndex))
+		if len(tables)==BATCH_TREES:
+			countBatch(counts,*stackTables(tables))
+			tables=[]
+	countBatch(counts,*stackTables(tables))
+	return counts
@@ -0,0 +1,158 @@
+# Monte Carlo errors of the summary by batch means
+#
+# The trees are split into consecutive batches of batchSize trees. For each pair
+# of hosts with a direct or an indirect transmission, and for the root host, the
+# sum and the sum of squares of its count in each complete batch are kept (exact
+# integers, so that they can be merged and saved like the counts). The variance of
+# the batch means then gives the Monte Carlo standard error (MCSE) and the
+# effective sample size (ESS) of each probability, in the same pass as the counts
+# and without keeping anything per tree. The trees of the last, incomplete batch
+# are counted in the summary but not in the errors.
+#
+# The batches are the same however the trees are split between processes: the
+# batches are numbered over all trees summarised, and the trees of a part that do
+# not fill a batch of their own stay open until the parts are merged in order.
+
+import math
+
+import numpy as np
+
+from .hosts import UNSAMPLED
+from .edges import EdgeCounts, TARGET_MASK
+
+
+## quantities with errors: roots are kept as pairs (Unsampled, root host)
+QUANTITIES=("direct","indirect","roots")
+
+
+## batch size for about numTrees trees: the square root of their number
+def batchSizeFor(numTrees):
+	return max(1,int(math.sqrt(max(1,numTrees))))
+
+
+## Sums of the counts per batch of the pairs of hosts (see the top of this file).
+## first is the number of trees summarised before the first one added here, or None
+## if it is not known, in which case no batch is closed until these batch means are
+## merged after the ones of the trees before them.
+class BatchMeans:
+
+	def __init__(self,batchSize,first=0):
+		self.batchSize=batchSize
+		self.first=first
+		self.numBatches=0
+		# trees added, including those of the batches still open
+		self.numTrees=0
+		# first batch (numbered from the first tree summarised) that is not closed
+		self.nextBatch=None if first==None else -(-first//batchSize)
+		# sum (column 0) and sum of squares (column 1) of the count in each complete batch
+		self.sums=dict((name,EdgeCounts(2)) for name in QUANTITIES)
+		# arrays (tree, key) of the counts of the open batches, trees numbered from the
+		# first one added here
+		self.open=dict((name,[]) for name in QUANTITIES)
+
+	## Add numTrees trees. events maps each quantity to the arrays (tree, key): the
+	## tree (0 to numTrees-1) and key (source<<32)|target of each pair counted in it.
+	def addTrees(self,numTrees,events):
+		for name,(trees,keys) in events.items():
+			self.open[name].append((np.asarray(trees,dtype=np.int64)+self.numTrees,np.asarray(keys,dtype=np.int64)))
+		self.numTrees+=numTrees
+		if self.first!=None:
+			self.closeBatches(self.nextBatch,(self.first+self.numTrees)//self.batchSize)
+
+	## (tree, key) arrays of the counts of the open batches of a quantity
+	def openCounts(self,name):
+		arrays=self.open[name]
+		if len(arrays)!=1:
+			arrays=[(np.concatenate([array[0] for array in arrays]+[np.zeros(0,dtype=np.int64)]),np.concatenate([array[1] for array in arrays]+[np.zeros(0,dtype=np.int64)]))]
+			self.open[name]=arrays
+		return arrays[0]
+
+	## add the counts of the batches from start to end (excluded) to the sums
+	def closeBatches(self,start,end):
+		if end<=start:
+			return
+		for name in QUANTITIES:
+			trees,keys=self.openCounts(name)
+			batch=(trees+self.first)//self.batchSize
+			done=(batch>=start)&(batch<end)
+			self.open[name]=[(trees[~done],keys[~done])]
+			batch=batch[done]
+			keys=keys[done]
+			if len(keys)==0:
+				continue
+			order=np.lexsort((keys,batch))
+			batch=batch[order]
+			keys=keys[order]
+			starts=np.concatenate(([0],np.nonzero((batch[1:]!=batch[:-1])|(keys[1:]!=keys[:-1]))[0]+1))
+			counts=np.diff(np.concatenate((starts,[len(keys)])))
+			sums=self.sums[name]
+			sums.addKeys(keys[starts],np.zeros(len(starts),dtype=np.int64),counts)
+			sums.addKeys(keys[starts],np.ones(len(starts),dtype=np.int64),counts*counts)
+		self.numBatches+=end-start
+		self.nextBatch=end
+
+	## Add the batches of other, the batch means of the trees that come right after
+	## these ones (so other.first is self.first+self.numTrees, or None), whose host
+	## ids are mapped through the array ids. The open batches of both are completed
+	## with the trees of the other where they meet.
+	def merge(self,other,ids):
+		for name in QUANTITIES:
+			self.sums[name].addEdges(other.sums[name],ids)
+			trees,keys=other.openCounts(name)
+			self.open[name].append((trees+self.numTrees,ids[keys>>32]<<32|ids[keys&TARGET_MASK]))
+		self.numTrees+=other.numTrees
+		end=(self.first+self.numTrees)//self.batchSize
+		if other.first!=None and other.numBatches>0:
+			# the batches of other are closed, only the ones before them can be
+			self.closeBatches(self.nextBatch,-(-other.first//self.batchSize))
+			self.numBatches+=other.numBatches
+			self.nextBatch=other.nextBatch
+		self.closeBatches(self.nextBatch,end)
+
+	## Source and target ids, probability, MCSE and ESS of the pairs of a quantity,
+	## over the complete batches (probability and errors are nan with less than two)
+	def estimates(self,name):
+		source,target,sums=self.sums[name].entries()
+		n=self.numBatches
+		b=self.batchSize
+		if n<2:
+			nan=np.full(len(source),np.nan)
+			return source,target,nan,nan,nan
+		mean=sums[:,0]/float(n*b)
+		# variance of the batch means, and of the count of one tree (0 or 1)
+		variance=np.maximum(sums[:,1]-sums[:,0]*sums[:,0]/float(n),0.0)/(n-1)/float(b*b)
+		treeVariance=mean*(1.0-mean)
+		mcse=np.sqrt(variance/n)
+		with np.errstate(divide="ignore",invalid="ignore"):
+			ess=np.where(variance>0,n*treeVariance/np.where(variance>0,variance,1.0),np.where(treeVariance>0,np.inf,np.nan))
+		return source,target,mean,mcse,ess
+
+	## arrays to save in a checkpoint, named with prefix (of batch means that start at
+	## the first tree summarised, as the ones of one process do)
+	def arrays(self,prefix):
+		saved={prefix+"batchSize":np.array(self.batchSize),prefix+"numBatches":np.array(self.numBatches),prefix+"numTrees":np.array(self.numTrees)}
+		for name in QUANTITIES:
+			self.sums[name].consolidate()
+			saved[prefix+name+"Keys"]=self.sums[name].keys
+			saved[prefix+name+"Values"]=self.sums[name].values
+			saved[prefix+name+"OpenTrees"],saved[prefix+name+"OpenKeys"]=self.openCounts(name)
+		return saved
+
+	## batch means saved with arrays, or None if there are none
+	@classmethod
+	def fromArrays(cls,saved,prefix):
+		if not (prefix+"batchSize" in saved.files):
+			return None
+		batchMeans=cls(int(saved[prefix+"batchSize"]))
+		batchMeans.numBatches=int(saved[prefix+"numBatches"])
+		batchMeans.numTrees=int(saved[prefix+"numTrees"])
+		batchMeans.nextBatch=batchMeans.numBatches
+		for name in QUANTITIES:
+			batchMeans.sums[name].restore(saved[prefix+name+"Keys"],saved[prefix+name+"Values"])
+			batchMeans.open[name]=[(saved[prefix+name+"OpenTrees"],saved[prefix+name+"OpenKeys"])]
+		return batchMeans
+
+
+## key of a root host
+def rootKey(host):
+	return (UNSAMPLED<<32)|host
@@ -0,0 +1,165 @@
+# Binary cache of the parsed trees of a .trees file
+#
+# The cache is a directory next to the trees file (FILE.trees.cache) with one
+# raw array per node column, concatenated over all trees:
+#   parent.bin   int32   parent of each node within its tree (-1 for the root)
+#   host.bin     int32   host id of each node (ids listed in hosts.txt)
+#   numTrans.bin int32   numTransmissions along the branch above each node
+#   length.bin   float64 branch length
+# plus offsets.bin (int64, first node of each tree and total number of nodes),
+# states.bin (int64, MCMC state of each tree) and meta.json, which records the
+# format version and the size, modification time and SHA-1 of the trees file.
+# The arrays are memory-mapped when the cache is read.
+
+import os
+import json
+import shutil
+import hashlib
+
+import numpy as np
+
+from .hosts import HostIndex
+from .newick import TreeFormatError, parseTree
+from .treesfile import readTrees
+from .batch import BATCH_TREES
+
+
+CACHE_VERSION=1
+
+columns=(("parent",np.int32),("host",np.int32),("numTrans",np.int32),("length",np.float64))
+
+
+## directory of the cache of a trees file
+def cacheDir(fileName):
+	return fileName+".cache"
+
+
+## SHA-1 of the content of a file
+def fileHash(fileName):
+	digest=hashlib.sha1()
+	inpF=open(fileName,"rb")
+	block=inpF.read(1<<20)
+	while block!=b"":
+		digest.update(block)
+		block=inpF.read(1<<20)
+	inpF.close()
+	return digest.hexdigest()
+
+
+## Is the cache in directory up to date with the trees file? The file is only
+## hashed again if its size is the same but it was modified after the cache was built.
+def cacheIsCurrent(fileName,directory):
+	metaName=os.path.join(directory,"meta.json")
+	if not os.path.isfile(metaName):
+		return False
+	metaF=open(metaName)
+	try:
+		meta=json.load(metaF)
+	except ValueError:
+		return False
+	finally:
+		metaF.close()
+	stat=os.stat(fileName)
+	if meta.get("version")!=CACHE_VERSION or meta.get("size")!=stat.st_size:
+		return False
+	if meta.get("mtime")==stat.st_mtime_ns:
+		return True
+	if meta.get("sha1")!=fileHash(fileName):
+		return False
+	meta["mtime"]=stat.st_mtime_ns
+	metaF=open(metaName,"w")
+	json.dump(meta,metaF)
+	metaF.close()
+	return True
+
+
+## Parse all trees of the file once and write them to the cache directory
+def buildCache(fileName,directory):
+	stat=os.stat(fileName)
+	tmpDir=directory+".tmp"
+	if os.path.isdir(tmpDir):
+		shutil.rmtree(tmpDir)
+	os.makedirs(tmpDir)
+	outFs={}
+	for name,dtype in columns:
+		outFs[name]=open(os.path.join(tmpDir,name+".bin"),"wb")
+	offsets=[0]
+	states=[]
+	hostIndex=HostIndex()
+	try:
+		for state,tree in readTrees(fileName):
+			table=parseTree(tree,hostIndex)
+			for name,dtype in columns:
+				outFs[name].write(np.array(getattr(table,name),dtype=dtype).tobytes())
+			offsets.append(offsets[-1]+len(table))
+			states.append(-1 if state==None else state)
+	except TreeFormatError:
+		# no partial cache is left behind
+		for name,dtype in columns:
+			outFs[name].close()
+		shutil.rmtree(tmpDir)
+		raise
+	for name,dtype in columns:
+		outFs[name].close()
+	np.array(offsets,dtype=np.int64).tofile(os.path.join(tmpDir,"offsets.bin"))
+	np.array(states,dtype=np.int64).tofile(os.path.join(tmpDir,"states.bin"))
+	hostsF=open(os.path.join(tmpDir,"hosts.txt"),"w")
+	for name in hostIndex.names:
+		hostsF.write(name+"\n")
+	hostsF.close()
+	meta={"version":CACHE_VERSION,"size":stat.st_size,"mtime":stat.st_mtime_ns,"sha1":fileHash(fileName),"numTrees":len(states),"numNodes":offsets[-1]}
+	metaF=open(os.path.join(tmpDir,"meta.json"),"w")
+	json.dump(meta,metaF)
+	metaF.close()
+	if os.path.isdir(directory):
+		shutil.rmtree(directory)
+	os.rename(tmpDir,directory)
+
+
+## Parsed trees read from a cache directory
+class TreeCache:
+
+	def __init__(self,directory):
+		self.directory=directory
+		self.hostIndex=HostIndex()
+		hostsF=open(os.path.join(directory,"hosts.txt"))
+		for line in hostsF:
+			self.hostIndex.add(line.rstrip("\n"))
+		hostsF.close()
+		self.offsets=np.fromfile(os.path.join(directory,"offsets.bin"),dtype=np.int64)
+		self.states=np.fromfile(os.path.join(directory,"states.bin"),dtype=np.int64)
+		self.numTrees=len(self.states)
+		for name,dtype in columns:
+			if self.offsets[-1]>0:
+				array=np.memmap(os.path.join(directory,name+".bin"),dtype=dtype,mode="r")
+			else:
+				array=np.zeros(0,dtype=dtype)
+			setattr(self,name,array)
+
+	## yield the trees after the first skip ones, BATCH_TREES at a time, as the
+	## (parent, host, numTransmissions, offsets) arrays of scotti_tools.batch
+	def batches(self,skip=0):
+		for i in range(skip,self.numTrees,BATCH_TREES):
+			j=min(i+BATCH_TREES,self.numTrees)
+			start=self.offsets[i]
+			end=self.offsets[j]
+			yield self.parent[start:end],self.host[start:end],self.numTrans[start:end],self.offsets[i:j+1]-start
+
+	## yield the trees of the given indices (in increasing order), BATCH_TREES at a
+	## time, as in batches
+	def batchesAt(self,indices):
+		for i in range(0,len(indices),BATCH_TREES):
+			trees=np.asarray(indices[i:i+BATCH_TREES],dtype=np.int64)
+			sizes=self.offsets[trees+1]-self.offsets[trees]
+			nodes=np.repeat(self.offsets[trees]-np.concatenate(([0],np.cumsum(sizes)[:-1])),sizes)+np.arange(sizes.sum())
+			yield self.parent[nodes],self.host[nodes],self.numTrans[nodes],np.concatenate(([0],np.cumsum(sizes)))
+
+
+## Cache of the trees file, built first if it is missing or out of date
+def openCache(fileName,directory=None):
+	if directory==None:
+		directory=cacheDir(fileName)
+	if not cacheIsCurrent(fileName,directory):
+		print("Building cache of parsed trees in "+directory)
+		buildCache(fileName,directory)
+	return TreeCache(directory)
@@ -0,0 +1,91 @@
+# Save and restore the counts of an interrupted summary
+
+import os
+import hashlib
+
+import numpy as np
+
+from .counts import TransmissionCounts
+from .batchmeans import BatchMeans
+
+
+CHECKPOINT_VERSION=2
+
+
+## SHA-1 of the first MB of the trees file, to recognise it when resuming
+def headHash(fileName):
+	inpF=open(fileName,"rb")
+	digest=hashlib.sha1(inpF.read(1<<20)).hexdigest()
+	inpF.close()
+	return digest
+
+
+## Save the counts (with their batch means if any) and the offset of the next tree
+## line to read in a .npz file. skip is the number of burnin trees, which must be
+## the same to resume.
+def saveCheckpoint(fileName,counts,inputF,skip,offset):
+	n=len(counts.hostIndex)
+	for edges in (counts.directTrans,counts.indirectTrans,counts.totOrigins):
+		edges.consolidate()
+	batchArrays={}
+	if counts.batchMeans!=None:
+		batchArrays=counts.batchMeans.arrays("batchMeans_")
+	tmpName=fileName+".tmp.npz"
+	np.savez(tmpName,
+		version=np.array(CHECKPOINT_VERSION),
+		input=np.array(headHash(inputF)),
+		skip=np.array(skip),
+		offset=np.array(offset),
+		numTrees=np.array(counts.numTrees),
+		names=np.array(counts.hostIndex.names),
+		hosts=np.array(counts.hosts,dtype=np.str_),
+		directKeys=counts.directTrans.keys,
+		directValues=counts.directTrans.values,
+		indirectKeys=counts.indirectTrans.keys,
+		indirectValues=counts.indirectTrans.values,
+		roots=counts.roots[:n],
+		originKeys=counts.totOrigins.keys,
+		originValues=counts.totOrigins.values,
+		doubleOrigins=counts.doubleOrigins[:n],
+		**batchArrays)
+	os.replace(tmpName,fileName)
+
+
+## Counts and offset of the next tree line saved in a checkpoint, or None if there
+## is no checkpoint for this trees file and burnin, and batch means of batchSize
+## trees (0 without)
+def loadCheckpoint(fileName,inputF,skip,batchSize=0):
+	if not os.path.isfile(fileName):
+		return None
+	try:
+		saved=np.load(fileName,allow_pickle=False)
+	except (OSError,ValueError):
+		print("Warning: checkpoint "+fileName+" cannot be read, starting from the beginning.")
+		return None
+	if int(saved["version"])!=CHECKPOINT_VERSION or str(saved["input"])!=headHash(inputF) or int(saved["skip"])!=skip:
+		print("Warning: checkpoint "+fileName+" was saved for a different trees file, burnin or version, starting from the beginning.")
+		return None
+	savedBatchSize=0
+	if "batchMeans_batchSize" in saved.files:
+		savedBatchSize=int(saved["batchMeans_batchSize"])
+	if savedBatchSize!=batchSize:
+		print("Warning: checkpoint "+fileName+" was saved with different Monte Carlo error estimates, starting from the beginning.")
+		return None
+	if int(saved["offset"])>os.path.getsize(inputF):
+		print("Warning: checkpoint "+fileName+" is ahead of the trees file, starting from the beginning.")
+		return None
+	counts=TransmissionCounts()
+	for name in saved["names"].tolist():
+		counts.hostIndex.add(name)
+	counts.reserve(len(counts.hostIndex))
+	n=len(counts.hostIndex)
+	counts.directTrans.restore(saved["directKeys"],saved["directValues"])
+	counts.indirectTrans.restore(saved["indirectKeys"],saved["indirectValues"])
+	counts.totOrigins.restore(saved["originKeys"],saved["originValues"])
+	for name in ("roots","doubleOrigins"):
+		getattr(counts,name)[:n]=saved[name]
+	counts.hosts=saved["hosts"].tolist()
+	counts.known=set(counts.hostIndex.ids[host] for host in counts.hosts)
+	counts.numTrees=int(saved["numTrees"])
+	counts.batchMeans=BatchMeans.fromArrays(saved,"batchMeans_")
+	return counts,int(saved["offset"])
@@ -0,0 +1,140 @@
+# Accumulated transmission counts over the sampled trees
+
+import numpy as np
+
+from .hosts import HostIndex, UNSAMPLED
+from .batch import stackTables, countBatch
+from .edges import EdgeCounts, EdgeList
+from .batchmeans import BatchMeans
+
+
+## number of bins of the histogram of indirect transmission lengths: bin k counts
+## transmissions through k+2 transmission events, the last bin also the longer ones
+LENGTH_BINS=8
+
+
+## Counts collected from a set of trees, indexed by host id: roots and double
+## origins in arrays, transmissions and origins by pair of hosts (see
+## scotti_tools.edges), indirect transmissions with one count per length bin.
+## Counts from different sets of trees can be merged, which gives the same
+## result as counting all trees together.
+class TransmissionCounts:
+
+	def __init__(self,hostIndex=None):
+		if hostIndex==None:
+			hostIndex=HostIndex()
+		self.hostIndex=hostIndex
+		self.hosts=[]
+		self.known=set()
+		self.numTrees=0
+		size=max(16,len(hostIndex))
+		self.directTrans=EdgeCounts()
+		self.indirectTrans=EdgeCounts(LENGTH_BINS)
+		self.roots=np.zeros(size,dtype=np.int64)
+		self.totOrigins=EdgeCounts()
+		self.doubleOrigins=np.zeros(size,dtype=np.int64)
+		# Monte Carlo errors, kept if set to a BatchMeans (see scotti_tools.batchmeans)
+		self.batchMeans=None
+
+	## grow the arrays (doubling their size) until they fit all hosts of the index
+	def reserve(self,numHosts):
+		size=len(self.roots)
+		if numHosts<=size:
+			return
+		while size<numHosts:
+			size*=2
+		old=len(self.roots)
+		for name in ("roots","doubleOrigins"):
+			array=np.zeros(size,dtype=np.int64)
+			array[:old]=getattr(self,name)
+			setattr(self,name,array)
+
+	## list the given hosts first, in this order, even if they are never seen in the trees
+	def addHosts(self,names):
+		for name in names:
+			h=self.hostIndex.add(name)
+			if h!=UNSAMPLED and not (h in self.known):
+				self.known.add(h)
+				self.hosts.append(name)
+		self.reserve(len(self.hostIndex))
+
+	## add the transmissions of several trees (NodeTables parsed with this hostIndex)
+	def addTrees(self,tables):
+		countBatch(self,*stackTables(tables))
+
+	## add the transmissions of trees stacked in arrays (see scotti_tools.batch)
+	def addBatch(self,parent,host,numTrans,offsets):
+		countBatch(self,parent,host,numTrans,offsets)
+
+	## add (sign=1) or remove (sign=-1) the counts of other, mapping its host ids to ours
+	def addCounts(self,other,sign):
+		ids=np.array([self.hostIndex.add(name) for name in other.hostIndex.names],dtype=np.intp)
+		self.reserve(len(self.hostIndex))
+		n=len(ids)
+		self.directTrans.addEdges(other.directTrans,ids,sign)
+		self.indirectTrans.addEdges(other.indirectTrans,ids,sign)
+		self.totOrigins.addEdges(other.totOrigins,ids,sign)
+		if sign==1 and self.batchMeans!=None and other.batchMeans!=None:
+			self.batchMeans.merge(other.batchMeans,ids)
+		elif sign==-1:
+			# batches cannot be removed from the errors
+			self.batchMeans=None
+		self.roots[ids]+=sign*other.roots[:n]
+		self.doubleOrigins[ids]+=sign*other.doubleOrigins[:n]
+		self.numTrees+=sign*other.numTrees
+
+	## add the counts of trees that come after the ones counted so far
+	def merge(self,other):
+		self.addCounts(other,1)
+		self.addHosts(other.hosts)
+
+	## remove the counts of trees that were counted before (the list of hosts is
+	## not changed, see scotti_tools.follow for how it is found again)
+	def subtract(self,other):
+		self.addCounts(other,-1)
+
+	## ids of the hosts found in the counted trees: every sampled host of a tree
+	## is either its root or has an origin
+	def presentHosts(self):
+		present=self.roots+self.doubleOrigins
+		present[UNSAMPLED]=0
+		return set(np.nonzero(present)[0].tolist())|set(self.totOrigins.entries()[0].tolist())
+
+	## position of each host id in self.hosts, -1 for Unsampled and the hosts not listed
+	def positions(self):
+		position=np.full(len(self.hostIndex),-1,dtype=np.int64)
+		position[[self.hostIndex.ids[host] for host in self.hosts]]=np.arange(len(self.hosts))
+		return position
+
+	## Counts of the sampled hosts in the order of self.hosts: direct and indirect
+	## transmissions (EdgeLists of host x host), roots (array), and origins (EdgeList
+	## of host x host, plus column H for "Unsampled" and H+1 for "doubleOrigin")
+	def ordered(self):
+		ids=np.array([self.hostIndex.ids[host] for host in self.hosts],dtype=np.intp)
+		H=len(ids)
+		position=self.positions()
+		lists=[]
+		for edges in (self.directTrans,self.indirectTrans):
+			source,target,values=edges.totals()
+			source=position[source]
+			target=position[target]
+			keep=(source>=0)&(target>=0)
+			lists.append(EdgeList(source[keep],target[keep],values[keep],H))
+		host,origin,values=self.totOrigins.totals()
+		host=position[host]
+		originPosition=position.copy()
+		originPosition[UNSAMPLED]=H
+		origin=originPosition[origin]
+		keep=(host>=0)&(origin>=0)
+		double=np.nonzero(self.doubleOrigins[ids])[0]
+		origins=EdgeList(np.concatenate((host[keep],double)),np.concatenate((origin[keep],np.full(len(double),H+1,dtype=np.int64))),np.concatenate((values[keep],self.doubleOrigins[ids][double])),H)
+		return lists[0],lists[1],self.roots[ids],origins
+
+
+## empty counts, with batch means of batchSize trees if it is not 0, the first one
+## after first others (see BatchMeans)
+def newCounts(batchSize=0,hostIndex=None,first=0):
+	counts=TransmissionCounts(hostIndex)
+	if batchSize>0:
+		counts.batchMeans=BatchMeans(batchSize,first)
+	return counts
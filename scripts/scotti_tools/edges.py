@@ -0,0 +1,143 @@
+# Sparse counts of pairs of hosts
+#
+# Most pairs of hosts never transmit to each other, so transmissions and origins
+# are kept for the observed pairs only, in coordinate (COO) form: the source and
+# target of each pair and its counts. Adding, merging and writing them costs in
+# the number of pairs observed, not in the square of the number of hosts.
+
+import numpy as np
+
+
+## number of counts added one at a time that wait before being merged into the arrays
+PENDING_COUNTS=1<<16
+
+## mask of the target in the key of a pair
+TARGET_MASK=(1<<32)-1
+
+
+## Counts of pairs of host ids. Each pair has width counts (columns), pairs whose
+## counts are all 0 are not kept. Counts are added one at a time (add) or as arrays
+## (addArrays), and merged into the sorted arrays of pairs when these are read.
+class EdgeCounts:
+
+	def __init__(self,width=1):
+		self.width=width
+		# sorted keys (source<<32)|target of the pairs, and their counts (pairs x width)
+		self.keys=np.zeros(0,dtype=np.int64)
+		self.values=np.zeros((0,width),dtype=np.int64)
+		# counts waiting to be merged: one at a time, and arrays of keys, columns and counts
+		self.pendingKeys=[]
+		self.pendingColumns=[]
+		self.pendingArrays=[]
+
+	## add one to column of the pair source, target
+	def add(self,source,target,column=0):
+		self.pendingKeys.append((source<<32)|target)
+		self.pendingColumns.append(column)
+		if len(self.pendingKeys)>=PENDING_COUNTS:
+			self.consolidate()
+
+	## add counts (default 1) to the columns (default 0) of the pairs of the arrays
+	## source and target, which may repeat
+	def addArrays(self,source,target,columns=None,counts=None):
+		self.addKeys((np.asarray(source,dtype=np.int64)<<32)|np.asarray(target,dtype=np.int64),columns,counts)
+
+	## add counts to the pairs of the array of keys (source<<32)|target, as in addArrays
+	def addKeys(self,keys,columns=None,counts=None):
+		keys=np.asarray(keys,dtype=np.int64)
+		if columns is None:
+			columns=np.zeros(len(keys),dtype=np.int64)
+		if counts is None:
+			counts=np.ones(len(keys),dtype=np.int64)
+		self.pendingArrays.append((keys,np.asarray(columns,dtype=np.int64),np.asarray(counts,dtype=np.int64)))
+
+	## merge the pending counts into the sorted arrays
+	def consolidate(self):
+		if len(self.pendingKeys)==0 and len(self.pendingArrays)==0:
+			return
+		rows,columns=np.nonzero(self.values)
+		arrays=[(self.keys[rows],columns,self.values[rows,columns])]
+		if len(self.pendingKeys)>0:
+			arrays.append((np.array(self.pendingKeys,dtype=np.int64),np.array(self.pendingColumns,dtype=np.int64),np.ones(len(self.pendingKeys),dtype=np.int64)))
+		arrays.extend(self.pendingArrays)
+		self.pendingKeys=[]
+		self.pendingColumns=[]
+		self.pendingArrays=[]
+		keys,inverse=np.unique(np.concatenate([array[0] for array in arrays]),return_inverse=True)
+		values=np.zeros((len(keys),self.width),dtype=np.int64)
+		np.add.at(values,(inverse.reshape(-1),np.concatenate([array[1] for array in arrays])),np.concatenate([array[2] for array in arrays]))
+		# pairs whose counts were all removed (see TransmissionCounts.subtract)
+		keep=np.any(values!=0,axis=1)
+		self.keys=keys[keep]
+		self.values=values[keep]
+
+	def __len__(self):
+		self.consolidate()
+		return len(self.keys)
+
+	## source and target ids of the pairs, and their counts (pairs x width)
+	def entries(self):
+		self.consolidate()
+		return self.keys>>32,self.keys&TARGET_MASK,self.values
+
+	## source and target ids of the pairs, and the sum of their counts
+	def totals(self):
+		source,target,values=self.entries()
+		return source,target,values.sum(axis=1)
+
+	## add sign times the counts of other, whose host ids are mapped through the array ids
+	def addEdges(self,other,ids,sign=1):
+		source,target,values=other.entries()
+		rows,columns=np.nonzero(values)
+		self.addArrays(ids[source[rows]],ids[target[rows]],columns,sign*values[rows,columns])
+
+	## replace the counts by the sorted keys and values saved from entries
+	def restore(self,keys,values):
+		self.keys=np.asarray(keys,dtype=np.int64)
+		self.values=np.asarray(values,dtype=np.int64).reshape(-1,self.width)
+		self.pendingKeys=[]
+		self.pendingColumns=[]
+		self.pendingArrays=[]
+
+
+## Values of pairs of hosts given by their position in a list of hosts, sorted by
+## source and then target as in the rows of a matrix: the pairs of source i are
+## those from rowStart[i] to rowStart[i+1] (compressed sparse rows).
+class EdgeList:
+
+	def __init__(self,source,target,value,numRows):
+		order=np.lexsort((target,source))
+		self.source=np.asarray(source,dtype=np.int64)[order]
+		self.target=np.asarray(target,dtype=np.int64)[order]
+		self.value=np.asarray(value)[order]
+		self.numRows=numRows
+		self.rowStart=np.searchsorted(self.source,np.arange(numRows+1))
+
+	def __len__(self):
+		return len(self.value)
+
+	## targets and values of the pairs from source i
+	def row(self,i):
+		return self.target[self.rowStart[i]:self.rowStart[i+1]],self.value[self.rowStart[i]:self.rowStart[i+1]]
+
+	## the values divided by numTrees, at least 1
+	def divided(self,numTrees):
+		return EdgeList(self.source,self.target,self.value/float(max(1,numTrees)),self.numRows)
+
+	## the sum of the values of both lists
+	def plus(self,other):
+		keys,inverse=np.unique(np.concatenate((self.source<<32|self.target,other.source<<32|other.target)),return_inverse=True)
+		value=np.zeros(len(keys),dtype=np.result_type(self.value,other.value))
+		np.add.at(value,inverse.reshape(-1),np.concatenate((self.value,other.value)))
+		return EdgeList(keys>>32,keys&TARGET_MASK,value,max(self.numRows,other.numRows))
+
+	## the pairs with a value larger than minValue
+	def above(self,minValue):
+		keep=self.value>minValue
+		return EdgeList(self.source[keep],self.target[keep],self.value[keep],self.numRows)
+
+	## the values as a numRows x numColumns matrix
+	def dense(self,numColumns):
+		matrix=np.zeros((self.numRows,numColumns),dtype=self.value.dtype)
+		matrix[self.source,self.target]=self.value
+		return matrix
@@ -0,0 +1,115 @@
+# Streaming reader for the FASTA alignments given to SCOTTI_generate_xml.py
+#
+# The file is scanned once for the name and the byte range of each record. A
+# sequence is read, and its lines joined, only when it is needed, so that the
+# alignment never has to fit in memory. As in the original reader of the script,
+# the name is the first word of the ">" line (or the word after a lone ">"), the
+# sequence is the first word of each following line, and a record ends at a blank
+# line or at the next ">" line. Lines between a blank line and the next ">" line
+# are ignored.
+
+import numpy as np
+
+
+## the FASTA file cannot be read
+class FastaFormatError(ValueError):
+	pass
+
+
+## Names and byte ranges of the records of a FASTA file
+class FastaIndex:
+
+	def __init__(self,fileName):
+		self.fileName=fileName
+		self.names=[]
+		self.ranges={}
+		self.scan()
+
+	def __len__(self):
+		return len(self.names)
+
+	def __contains__(self,name):
+		return name in self.ranges
+
+	## find the records of the file, reading it once without keeping the sequences
+	def scan(self):
+		inpF=open(self.fileName,"rb")
+		offset=0
+		name=None
+		start=0
+		for line in inpF:
+			words=line.split()
+			if name!=None:
+				if len(words)>0 and words[0][:1]!=b">":
+					offset+=len(line)
+					continue
+				self.ranges[name]=(start,offset)
+				name=None
+			if len(words)>0 and words[0][:1]==b">":
+				if len(words[0])>1:
+					name=words[0].replace(b">",b"").decode()
+				elif len(words)>1:
+					name=words[1].decode()
+				else:
+					inpF.close()
+					raise FastaFormatError("Wrong format in fasta file, a name line without a name\n")
+				if name in self.ranges:
+					inpF.close()
+					raise FastaFormatError("Error, multiple entries with same name "+name+" in fasta file. Only first part of the name line is used for the name.")
+				self.names.append(name)
+				self.ranges[name]=None
+				start=offset+len(line)
+			offset+=len(line)
+		if name!=None:
+			self.ranges[name]=(start,offset)
+		inpF.close()
+		if len(self.names)==0:
+			raise FastaFormatError("Wrong format in fasta file\n")
+
+	## sequence of a record from the bytes of its lines
+	def joinLines(self,data):
+		return b"".join([line.split()[0] for line in data.splitlines()]).decode()
+
+	## sequence of the record name
+	def sequence(self,name):
+		start,end=self.ranges[name]
+		inpF=open(self.fileName,"rb")
+		inpF.seek(start)
+		data=inpF.read(end-start)
+		inpF.close()
+		return self.joinLines(data)
+
+	## yield (name, sequence) for the records in file order, one sequence in memory at a time
+	def sequences(self):
+		inpF=open(self.fileName,"rb")
+		for name in self.names:
+			start,end=self.ranges[name]
+			inpF.seek(start)
+			yield (name,self.joinLines(inpF.read(end-start)))
+		inpF.close()
+
+
+## Constant sites of the alignment, found column by column reading one sequence
+## at a time: returns the indices of the other (variable) columns and the number
+## of constant columns of each base A, C, G and T. A column is constant if all
+## sequences have the same base there (in upper or lower case), so columns with
+## gaps or ambiguous characters are always variable.
+def constantSites(index):
+	reference=None
+	constant=None
+	for name,sequence in index.sequences():
+		bases=np.frombuffer(sequence.upper().encode(),dtype=np.uint8)
+		if reference is None:
+			reference=bases
+			constant=np.isin(bases,np.frombuffer(b"ACGT",dtype=np.uint8))
+		elif len(bases)!=len(reference):
+			raise FastaFormatError("Error, sequence "+name+" has length "+str(len(bases))+" but sequence "+index.names[0]+" has length "+str(len(reference))+", the sequences must be aligned.")
+		else:
+			constant&=bases==reference
+	counts=[int(np.count_nonzero(reference[constant]==ord(base))) for base in "ACGT"]
+	return np.nonzero(~constant)[0],counts
+
+
+## the characters of a sequence at the given column indices
+def selectSites(sequence,columns):
+	return np.frombuffer(sequence.encode(),dtype=np.uint8)[columns].tobytes().decode()
@@ -0,0 +1,105 @@
+# Summarise a trees file while BEAST2 is still appending trees to it
+
+import time
+from array import array
+
+from .newick import parseTree
+from .treesfile import splitTreeLine, readTreeRange
+from .counts import TransmissionCounts
+from .transmissions import findNewHosts
+from .batch import countTreeRange
+
+
+## Follow a growing trees file. Only the trees appended since the last update are
+## parsed and counted, and the counts are always those of a full summary of the
+## trees written so far (with the burnin as a percentage of them).
+class TreesFollower:
+
+	def __init__(self,fileName,burnin,hosts=()):
+		self.fileName=fileName
+		self.burnin=burnin
+		self.seeded=list(hosts)
+		self.counts=TransmissionCounts()
+		self.counts.addHosts(self.seeded)
+		self.offsets=array("q")
+		self.position=0
+		self.normalL=None
+		self.counted=0
+		self.finished=False
+
+	## number of trees read so far
+	def numTrees(self):
+		return len(self.offsets)
+
+	## number of burnin trees among the trees read so far
+	def burned(self):
+		return int((float(self.burnin)/100)*len(self.offsets))
+
+	## find the tree lines appended since the last update (complete lines only)
+	def readNew(self):
+		inpF=open(self.fileName,"rb")
+		inpF.seek(self.position)
+		line=inpF.readline()
+		while line.endswith(b"\n") and not self.finished:
+			if self.normalL==None:
+				if len(line.split())>0 and line.split()[0]==b"tree":
+					self.normalL=len(line.split())
+			if self.normalL!=None:
+				if splitTreeLine(line,self.normalL)==None:
+					self.finished=True
+					break
+				self.offsets.append(self.position)
+			self.position+=len(line)
+			line=inpF.readline()
+		# the last line can also end the trees block without a newline ("End;")
+		if self.normalL!=None and line!=b"" and not line.endswith(b"\n") and not (line.startswith(b"tree") or b"tree".startswith(line)):
+			self.finished=True
+		inpF.close()
+
+	## offset of the line of tree i, or the end of the trees read so far
+	def offset(self,i):
+		if i<len(self.offsets):
+			return self.offsets[i]
+		return self.position
+
+	## count the trees between offsets start and end, returns their counts
+	def countRange(self,counts,start,end):
+		return countTreeRange(counts,self.fileName,start,end)
+
+	## Read the new trees and update the counts, returns the number of new trees.
+	## Trees that became burnin are read again and removed from the counts, then
+	## the hosts are listed again in the order in which they are found in the
+	## remaining trees.
+	def update(self):
+		first=len(self.offsets)
+		self.readNew()
+		burned=self.burned()
+		counts=self.counts
+		if burned>self.counted:
+			if first>self.counted:
+				counts.subtract(self.countRange(TransmissionCounts(),self.offset(self.counted),self.offset(min(burned,first))))
+				present=counts.presentHosts()
+				counts.hosts=[]
+				counts.known=set()
+				counts.addHosts(self.seeded)
+				for state,tree in readTreeRange(self.fileName,self.offset(burned),self.offset(first)):
+					if present<=counts.known:
+						break
+					findNewHosts(parseTree(tree,counts.hostIndex),counts.known,counts.hosts,counts.hostIndex.names)
+			self.counted=burned
+		self.countRange(counts,self.offset(max(first,burned)),self.position)
+		return len(self.offsets)-first
+
+	## Update every interval seconds and call report(follower) after each update
+	## with new trees, until the end of the trees block is written or the user
+	## interrupts with Ctrl-C
+	def follow(self,interval,report):
+		try:
+			while True:
+				if self.update()>0:
+					report(self)
+				if self.finished:
+					break
+				time.sleep(interval)
+		except KeyboardInterrupt:
+			print("Stopped following "+self.fileName)
@@ -0,0 +1,53 @@
+# Interning table for host names
+
+
+## Host names and their integer ids. "Unsampled" always has id 0, so that
+## counts can be kept in arrays indexed by host id. annotations maps node
+## metadata already seen to their (host id, numTransmissions), see newick.parseTree.
+class HostIndex:
+	__slots__=("ids","names","annotations")
+
+	def __init__(self):
+		self.ids={}
+		self.names=[]
+		self.annotations={}
+		self.add("Unsampled")
+
+	def __len__(self):
+		return len(self.names)
+
+	## id of a host, adding it to the table if it is new
+	def add(self,name):
+		if name in self.ids:
+			return self.ids[name]
+		self.ids[name]=len(self.names)
+		self.names.append(name)
+		return self.ids[name]
+
+
+UNSAMPLED=0
+
+
+## read a csv file with the host of each sample ("sample, host" lines), as used
+## by SCOTTI_generate_xml.py, returns a dict sample -> host in file order
+def readHostsCsv(fileName):
+	hFile=open(fileName)
+	hosts={}
+	for line in hFile:
+		linesplit=("".join(line.split())).split(",")
+		if len(linesplit)>1:
+			hosts[linesplit[0]]=linesplit[1]
+	hFile.close()
+	return hosts
+
+
+## hosts of the given samples (e.g. the tips of the Translate block of a trees
+## file) in order of first appearance, or of all samples if none are given
+def sampledHosts(sampleHosts,samples=None):
+	if not samples:
+		samples=sampleHosts.keys()
+	hosts=[]
+	for sample in samples:
+		if sample in sampleHosts and not (sampleHosts[sample] in hosts):
+			hosts.append(sampleHosts[sample])
+	return hosts
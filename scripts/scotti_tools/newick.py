@@ -0,0 +1,108 @@
+# Single-pass parser for the SCOTTI trees logged by BEAST2
+
+import re
+
+
+## One token of a tree: an opening parenthesis, a comma or the final semicolon,
+## or a node (a leaf, or a closing parenthesis) with its label, [&metadata] and
+## :branchLength
+token=re.compile(rb"([(,;])|(\))?([^(),;\[:]*)(?:\[([^\]]*)\])?(?::([^(),;\[]*))?")
+
+## host and numTransmissions attributes of the metadata, which can also hold other
+## attributes
+hostAttribute=re.compile(rb"(?:^|,)&?host=([^,{}]*)")
+numTransAttribute=re.compile(rb"(?:^|,)&?numTransmissions=([^,{}]*)")
+
+## maximum number of distinct metadata strings remembered by each HostIndex
+MAX_ANNOTATIONS=1<<16
+
+
+## a tree that cannot be read: unbalanced parentheses, missing or inconsistent metadata
+class TreeFormatError(ValueError):
+	pass
+
+
+## Node table of one tree. Nodes are numbered in pre-order (left to right),
+## so the root is node 0 and every node comes after its parent.
+class NodeTable:
+	__slots__=("parent","host","numTrans","length")
+
+	def __init__(self):
+		self.parent=[]
+		self.host=[]
+		self.numTrans=[]
+		self.length=[]
+
+	def __len__(self):
+		return len(self.parent)
+
+	def addNode(self,parent):
+		node=len(self.parent)
+		self.parent.append(parent)
+		self.host.append(-1)
+		self.numTrans.append(0)
+		self.length.append(0.0)
+		return node
+
+
+## Host name and number of transmissions of the metadata of a node (the bytes
+## between "[" and "]"), node describes the node in the errors. The number must be
+## an integer: the mean numbers of summary trees (e.g. made by TreeAnnotator)
+## cannot be summarised.
+def decodeAnnotation(metadata,node="a node"):
+	host=None if metadata==None else hostAttribute.search(metadata)
+	numT=None if metadata==None else numTransAttribute.search(metadata)
+	if host==None or numT==None:
+		raise TreeFormatError("Traits in tree are not recognised: could not find host or number of transmission events along branch!\n"+("" if metadata==None else metadata.decode(errors="replace")))
+	value=numT.group(1).decode(errors="replace")
+	try:
+		numT=int(value)
+	except ValueError:
+		try:
+			numT=float(value)
+		except ValueError:
+			raise TreeFormatError("Number of transmission events "+value+" of "+node+" is not a number!\n"+metadata.decode(errors="replace"))
+		if not numT.is_integer():
+			raise TreeFormatError("Number of transmission events "+value+" of "+node+" is not an integer, is this a summary tree? Only the trees sampled by BEAST2 can be summarised.\n"+metadata.decode(errors="replace"))
+		numT=int(numT)
+	return host.group(1).decode(),numT
+
+
+## Parse a tree (bytes, or str) walking it once. Host names are replaced by their
+## ids in hostIndex (a HostIndex), and new hosts are added to it. Each distinct
+## metadata string is decoded once and remembered in hostIndex.annotations.
+def parseTree(tree,hostIndex):
+	if isinstance(tree,str):
+		tree=tree.encode()
+	annotations=hostIndex.annotations
+	table=NodeTable()
+	stack=[]
+	for match in token.finditer(tree):
+		char,close,label,metadata,length=match.groups()
+		if char!=None:
+			if char==b"(":
+				stack.append(table.addNode(stack[-1] if stack else -1))
+			elif char==b";":
+				break
+			continue
+		if close!=None:
+			if not stack:
+				raise TreeFormatError("Tree has unbalanced parenthesis\n"+tree.decode(errors="replace"))
+			node=stack.pop()
+		elif label or metadata!=None or length!=None:
+			node=table.addNode(stack[-1] if stack else -1)
+		else:
+			continue
+		decoded=annotations.get(metadata)
+		if decoded==None:
+			host,numT=decodeAnnotation(metadata,"node "+str(node)+(" ("+label.decode(errors="replace")+")" if label else ""))
+			decoded=(hostIndex.add(host),numT)
+			if len(annotations)<MAX_ANNOTATIONS:
+				annotations[metadata]=decoded
+		table.host[node]=decoded[0]
+		table.numTrans[node]=decoded[1]
+		if length:
+			table.length[node]=float(length)
+	if stack or len(table)==0:
+		raise TreeFormatError("Tree does not strart or end in parenthesis\n"+tree.decode(errors="replace"))
+	return table
@@ -0,0 +1,150 @@
+# Write the summary of the sampled transmissions
+
+import io
+import os
+import csv
+import json
+
+import numpy as np
+
+
+## "host probability, " for the pairs of row i of edges (except to host i itself) over numTrees
+def probabilityList(hosts,edges,i,numTrees):
+	targets,counts=edges.row(i)
+	return [hosts[j]+" "+str(float(count)/numTrees)+", " for j,count in zip(targets.tolist(),counts.tolist()) if j!=i]
+
+
+## Record inferred network in text file. The counts are in the order of hosts
+## (see TransmissionCounts.ordered), the transmissions and origins in EdgeLists.
+## The text is built in memory, and the file is replaced at once, so that it can
+## be read while it is rewritten. With no trees, all probabilities are 0.
+def writeNetwork(fileName,hosts,numTrees,directTrans,indirectTrans,roots,totOrigins):
+	H=len(hosts)
+	numTrees=max(1,numTrees)
+	#hosts
+	parts=["Hosts: "]
+	parts.extend(host+", " for host in hosts)
+	parts.append("\n\n\n")
+	#roots
+	parts.append("Probabilities of being root: ")
+	parts.extend(hosts[i]+" "+str(float(roots[i])/numTrees)+", " for i in range(H))
+	parts.append("\n\n\n")
+	#direct transmissions
+	parts.append("Probabilities direct transmission: \n\n")
+	for i in range(H):
+		parts.append("From host "+hosts[i]+" to : \n")
+		parts.extend(probabilityList(hosts,directTrans,i,numTrees))
+		parts.append("\n\n")
+	parts.append("\n\n")
+	#indirect transmissions
+	parts.append("Probabilities indirect transmission: \n")
+	for i in range(H):
+		parts.append("From host "+hosts[i]+" to : \n")
+		parts.extend(probabilityList(hosts,indirectTrans,i,numTrees))
+		parts.append("\n\n")
+	parts.append("\n\n")
+	#origins
+	parts.append("Probabilities of direct transmittor to each sampled host: \n\n")
+	originHosts=list(hosts)+["Unsampled","doubleOrigin"]
+	for i in range(H):
+		parts.append("To host "+hosts[i]+" from : \n")
+		if totOrigins.rowStart[i+1]>totOrigins.rowStart[i]:
+			parts.extend(probabilityList(originHosts,totOrigins,i,numTrees))
+			parts.append("\n\n")
+	parts.append("\n\n")
+	outF=open(fileName+".tmp","w")
+	outF.write("".join(parts))
+	outF.close()
+	os.replace(fileName+".tmp",fileName)
+
+
+## Tables of the nonzero counts of a summary (a summary.TransmissionSummary), as
+## columns (dicts of lists):
+##   edges    source, target, type ("direct" or "indirect"), count, probability
+##   roots    host, count, probability
+##   origins  host, origin (a host, "Unsampled" or "doubleOrigin"), count, probability
+## Probabilities are the counts divided by the number of trees summarised.
+def summaryTables(summary):
+	hosts=np.array(summary.hosts,dtype=object)
+	originHosts=np.array(summary.originHosts,dtype=object)
+	numTrees=float(max(1,summary.numTrees))
+	edges={"source":[],"target":[],"type":[],"count":[],"probability":[]}
+	for kind,counts in (("direct",summary.directTrans),("indirect",summary.indirectTrans)):
+		edges["source"].extend(hosts[counts.source].tolist())
+		edges["target"].extend(hosts[counts.target].tolist())
+		edges["type"].extend([kind]*len(counts))
+		edges["count"].extend(counts.value.tolist())
+		edges["probability"].extend((counts.value/numTrees).tolist())
+	present=np.nonzero(summary.roots)[0]
+	roots={"host":hosts[present].tolist(),"count":summary.roots[present].tolist(),"probability":(summary.roots[present]/numTrees).tolist()}
+	counts=summary.totOrigins
+	origins={"host":hosts[counts.source].tolist(),"origin":originHosts[counts.target].tolist(),"count":counts.value.tolist(),"probability":(counts.value/numTrees).tolist()}
+	return {"edges":edges,"roots":roots,"origins":origins}
+
+
+## write a file at once, replacing it
+def replaceFile(fileName,text):
+	outF=open(fileName+".tmp","w",newline="")
+	outF.write(text)
+	outF.close()
+	os.replace(fileName+".tmp",fileName)
+
+
+## write the columns of a table as a csv file with a header line
+def writeCsv(fileName,table):
+	text=io.StringIO()
+	writer=csv.writer(text,lineterminator="\n")
+	writer.writerow(list(table.keys()))
+	writer.writerows(zip(*table.values()))
+	replaceFile(fileName,text.getvalue())
+
+
+## Write the tables of summaryTables as prefix_edges.csv, prefix_roots.csv and
+## prefix_origins.csv, returns the file names
+def writeTablesCsv(prefix,summary):
+	names=[]
+	for name,table in summaryTables(summary).items():
+		writeCsv(prefix+"_"+name+".csv",table)
+		names.append(prefix+"_"+name+".csv")
+	return names
+
+
+## Write the summary as JSON: the number of trees, the hosts and the tables of
+## summaryTables, each as an object of columns
+def writeSummaryJson(fileName,summary):
+	document={"numTrees":summary.numTrees,"totTrees":summary.totTrees,"burned":summary.burned,"hosts":summary.hosts}
+	document.update(summaryTables(summary))
+	replaceFile(fileName,json.dumps(document))
+
+
+## Monte Carlo errors of a summary whose counts have batch means (see
+## scotti_tools.batchmeans), as columns: type ("direct", "indirect" or "root"),
+## source (the root host for roots), target (empty for roots), probability (as in
+## the summary), mcse and ess. Only the pairs seen in the complete batches are listed.
+def errorTable(summary):
+	batchMeans=summary.counts.batchMeans
+	position=summary.counts.positions()
+	hosts=np.array(summary.hosts,dtype=object)
+	table={"type":[],"source":[],"target":[],"probability":[],"mcse":[],"ess":[]}
+	for kind,name,edges in (("direct","direct",summary.directProb),("indirect","indirect",summary.indirectProb),("root","roots",None)):
+		source,target,mean,mcse,ess=batchMeans.estimates(name)
+		source=position[source]
+		target=position[target]
+		if edges==None:
+			# roots are pairs (Unsampled, root host)
+			keep=np.nonzero(target>=0)[0]
+			keep=keep[np.argsort(target[keep],kind="stable")]
+			table["source"].extend(hosts[target[keep]].tolist())
+			table["target"].extend([""]*len(keep))
+			table["probability"].extend(summary.rootProb[target[keep]].tolist())
+		else:
+			keep=np.nonzero((source>=0)&(target>=0))[0]
+			keep=keep[np.lexsort((target[keep],source[keep]))]
+			keys=(source[keep]<<32)|target[keep]
+			table["source"].extend(hosts[source[keep]].tolist())
+			table["target"].extend(hosts[target[keep]].tolist())
+			table["probability"].extend(edges.value[np.searchsorted((edges.source<<32)|edges.target,keys)].tolist())
+		table["type"].extend([kind]*len(keep))
+		table["mcse"].extend(mcse[keep].tolist())
+		table["ess"].extend(ess[keep].tolist())
+	return table
@@ -0,0 +1,50 @@
+# Summarise the trees of one file with several worker processes
+
+import multiprocessing
+
+from .treesfile import treeOffset, splitTrees
+from .counts import newCounts
+from .batch import countTreeRange, countTreesAt
+
+
+## count the transmissions in the trees starting in one byte range of the file
+def summariseChunk(chunk):
+	fileName,start,end,batchSize,first=chunk
+	return countTreeRange(newCounts(batchSize,first=first),fileName,start,end)
+
+
+## count the transmissions in the trees at a list of byte offsets of the file
+def summariseOffsets(chunk):
+	fileName,offsets,batchSize,first=chunk
+	return countTreesAt(newCounts(batchSize,first=first),fileName,offsets)
+
+
+## Count the transmissions in all trees after the first skip ones with numJobs processes
+## (hosts are listed first, as in TransmissionCounts.addHosts), or only in the trees
+## at the given byte offsets (see scotti_tools.selection).
+## Each process counts a byte range of the file, and the partial counts are merged
+## in file order, so the result is the same as counting the trees one after the other.
+## With batchSize, the batch means of each range are kept (see scotti_tools.batchmeans).
+## The position of a byte range among the trees is not known, so its batches are only
+## closed when it is merged, while the ones of a list of offsets are closed as they fill.
+def summariseParallel(fileName,skip,numJobs,hosts=(),offsets=None,batchSize=0):
+	if offsets==None:
+		worker=summariseChunk
+		start=treeOffset(fileName,skip)
+		chunks=[(fileName,s,e,batchSize,None) for s,e in splitTrees(fileName,start,numJobs*4)]
+	else:
+		worker=summariseOffsets
+		size=max(1,-(-len(offsets)//(numJobs*4)))
+		chunks=[(fileName,offsets[i:i+size],batchSize,i) for i in range(0,len(offsets),size)]
+	if "fork" in multiprocessing.get_all_start_methods():
+		context=multiprocessing.get_context("fork")
+	else:
+		context=multiprocessing.get_context()
+	counts=newCounts(batchSize)
+	counts.addHosts(hosts)
+	pool=context.Pool(numJobs)
+	for partial in pool.imap(worker,chunks):
+		counts.merge(partial)
+	pool.close()
+	pool.join()
+	return counts
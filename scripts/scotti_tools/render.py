@@ -0,0 +1,210 @@
+# Draw the transmission networks
+#
+# A renderer draws one network at a time from the host names, the transmission
+# probabilities (an EdgeList, see scotti_tools.edges) and the root probabilities.
+# Plot options are read from the attributes of options, as parsed by
+# Make_transmission_tree.py: minValue, edgeThickness, vertexFont, vertexColor,
+# edgeColor and outputSize. Each renderer imports its plotting library only when
+# it draws, so that summaries without plots do not need any of them.
+
+import os
+import shutil
+import tempfile
+import subprocess
+
+
+## a graph could not be drawn
+class RenderError(RuntimeError):
+	pass
+
+
+## Base class of the renderers
+class Renderer:
+	name=""
+	## format of the output files if none is given
+	defaultFormat="pdf"
+
+	## file format of the graphs
+	def format(self,fmt=None):
+		if fmt==None or fmt=="":
+			return self.defaultFormat
+		return fmt
+
+	## Draw the network into fileName. Edges are drawn for probabilities larger
+	## than options.minValue, and with showRoots the root probability is written
+	## next to the name of each host.
+	def draw(self,fileName,hosts,prob,rootProb,options,showRoots,fmt=None):
+		raise NotImplementedError
+
+	## called after the last graph is drawn
+	def close(self):
+		pass
+
+
+## graph_tool, with matplotlib color maps
+class GraphToolRenderer(Renderer):
+	name="graph_tool"
+
+	def draw(self,fileName,hosts,prob,rootProb,options,showRoots,fmt=None):
+		from graph_tool.all import Graph, graph_draw
+		import matplotlib.pyplot as plt
+		edges=prob.above(float(options.minValue))
+		g = Graph()
+		verteces=[]
+		directEdges=[]
+		for h1 in hosts:
+			verteces.append(g.add_vertex())
+		for h1,h2 in zip(edges.source.tolist(),edges.target.tolist()):
+			directEdges.append(g.add_edge(verteces[h1], verteces[h2]))
+
+		#Add information to graph
+		eThick=float(options.edgeThickness)
+		rootProbV = g.new_vertex_property("double")
+		for h1 in range(len(hosts)):
+			rootProbV[g.vertex(h1)]=rootProb[h1]
+		g.vertex_properties["root probability"] = rootProbV
+		vertName = g.new_vertex_property("string")
+		for h1 in range(len(hosts)):
+			if showRoots:
+				vertName[g.vertex(h1)]=hosts[h1]+" "+("%.2f" % rootProb[h1])
+			else:
+				vertName[g.vertex(h1)]=hosts[h1]
+		g.vertex_properties["host name"] = vertName
+
+		transProb = g.new_edge_property("double")
+		transProbText = g.new_edge_property("string")
+		for edge,weight in zip(directEdges,edges.value.tolist()):
+			transProb[edge] = weight*eThick +2.0
+			transProbText[edge] = ("%.2f" % weight)
+		g.edge_properties["transmission probability"] = transProb
+		g.edge_properties["transmission probability, text"] = transProbText
+
+		oSize=options.outputSize
+		oformat=self.format(fmt)
+		graph_draw(g, vertex_text=vertName, vertex_font_size=int(options.vertexFont), output_size=(oSize, oSize), edge_pen_width=transProb, output=fileName, vertex_fill_color=rootProbV, vcmap=plt.get_cmap(options.vertexColor), vertex_pen_width=2.0, bg_color=[1., 1., 1., 1.], edge_text=transProbText, edge_color=transProb, ecmap=plt.get_cmap(options.edgeColor), fmt=oformat)
+
+
+## DOT text of a network, with one node per host and one edge per probability
+## (in the EdgeList prob) larger than minValue
+def dotGraph(hosts,prob,minValue):
+	lines=['digraph G {\nnode [width=.3,height=.3,shape=octagon,style=filled,color=skyblue];\noverlap="false";\nrankdir="LR";\n']
+	names=['"'+host.replace('\\','\\\\').replace('"','\\"')+'"' for host in hosts]
+	edges=prob.above(minValue)
+	for h1 in range(len(hosts)):
+		lines.append(names[h1]+';\n')
+		targets,weights=edges.row(h1)
+		for h2,weight in zip(targets.tolist(),weights.tolist()):
+			lines.append('      '+names[h1]+' -> '+names[h2]+' [label="'+"{:.2f}".format(weight)+'",penwidth='+str(float(weight))+',color=black];\n')
+	lines.append('}\n')
+	return "".join(lines)
+
+
+## Graphviz. The DOT text of the graphs is kept in memory and sent on the standard
+## input of the dot program, which lays out all graphs waiting to be drawn in one
+## run (when close or flush is called, or when batchSize graphs are waiting).
+class DotRenderer(Renderer):
+	name="dot"
+	defaultFormat="jpg"
+
+	def __init__(self,program="dot",batchSize=64):
+		self.program=program
+		self.batchSize=batchSize
+		self.pending=[]
+
+	def draw(self,fileName,hosts,prob,rootProb,options,showRoots,fmt=None):
+		self.pending.append((fileName,self.format(fmt),dotGraph(hosts,prob,float(options.minValue))))
+		if len(self.pending)>=self.batchSize:
+			self.flush()
+
+	def close(self):
+		self.flush()
+
+	## run dot with arguments, the graphs on its standard input
+	def run(self,arguments,graphs,directory=None):
+		try:
+			process=subprocess.run([self.program]+arguments,input="".join(graphs).encode(),stdout=subprocess.PIPE,stderr=subprocess.PIPE,cwd=directory)
+		except OSError as error:
+			raise RenderError("Graphviz could not be run ("+self.program+": "+str(error)+"), is it installed?")
+		if process.returncode!=0:
+			raise RenderError("Graphviz failed with exit status "+str(process.returncode)+":\n"+process.stderr.decode(errors="replace"))
+
+	## Draw the graphs waiting to be drawn, one run of dot per output format. With
+	## -O dot names the output of the graphs after their number in the input, in a
+	## temporary directory next to the first output file, from which they are moved.
+	def flush(self):
+		pending=self.pending
+		self.pending=[]
+		formats=[]
+		for fileName,fmt,graph in pending:
+			if not (fmt in formats):
+				formats.append(fmt)
+		for fmt in formats:
+			batch=[(fileName,graph) for fileName,f,graph in pending if f==fmt]
+			if len(batch)==1:
+				self.run(["-T"+fmt,"-o"+batch[0][0]],[batch[0][1]])
+				continue
+			directory=tempfile.mkdtemp(prefix=".dot",dir=os.path.dirname(os.path.abspath(batch[0][0])))
+			try:
+				self.run(["-T"+fmt,"-O"],[graph for fileName,graph in batch],directory)
+				outputs=sorted(os.listdir(directory),key=outputNumber)
+				if len(outputs)==len(batch):
+					for (fileName,graph),output in zip(batch,outputs):
+						os.replace(os.path.join(directory,output),fileName)
+				else:
+					# this version of dot does not number its outputs, draw the graphs one by one
+					for fileName,graph in batch:
+						self.run(["-T"+fmt,"-o"+fileName],[graph])
+			finally:
+				shutil.rmtree(directory,ignore_errors=True)
+
+
+## number of the graph of an output file of dot -O (noname.gv.jpg, noname.gv.2.jpg, ...)
+def outputNumber(fileName):
+	parts=fileName.split(".")
+	if len(parts)>3 and parts[-2].isdigit():
+		return int(parts[-2])
+	return 1
+
+
+## matplotlib only, with the hosts on a circle
+class MatplotlibRenderer(Renderer):
+	name="matplotlib"
+
+	def draw(self,fileName,hosts,prob,rootProb,options,showRoots,fmt=None):
+		import math
+		import matplotlib
+		matplotlib.use("Agg")
+		import matplotlib.pyplot as plt
+		minV=float(options.minValue)
+		eThick=float(options.edgeThickness)
+		vcmap=plt.get_cmap(options.vertexColor)
+		ecmap=plt.get_cmap(options.edgeColor)
+		size=options.outputSize/100.0
+		fig=plt.figure(figsize=(size,size),dpi=100)
+		ax=fig.add_axes([0,0,1,1])
+		x=[math.cos(2*math.pi*h/max(1,len(hosts))) for h in range(len(hosts))]
+		y=[math.sin(2*math.pi*h/max(1,len(hosts))) for h in range(len(hosts))]
+		edges=prob.above(minV)
+		for h1,h2,weight in zip(edges.source.tolist(),edges.target.tolist(),edges.value.tolist()):
+			if h1!=h2:
+				ax.annotate("",xy=(x[h2],y[h2]),xytext=(x[h1],y[h1]),arrowprops=dict(arrowstyle="-|>",lw=weight*eThick/2.0+1.0,color=ecmap(weight),shrinkA=18,shrinkB=18,connectionstyle="arc3,rad=0.15"))
+				ax.text((x[h1]+x[h2])/2+0.075*(y[h2]-y[h1]),(y[h1]+y[h2])/2+0.075*(x[h1]-x[h2]),"%.2f" % weight,ha="center",va="center",fontsize=int(options.vertexFont)*0.6)
+		ax.scatter(x,y,s=900,c=[vcmap(r) for r in rootProb],edgecolors="black",linewidths=2.0,zorder=3)
+		for h in range(len(hosts)):
+			label=hosts[h]+(" "+("%.2f" % rootProb[h]) if showRoots else "")
+			ax.text(x[h],y[h],label,ha="center",va="center",fontsize=int(options.vertexFont),zorder=4)
+		ax.set_xlim(-1.3,1.3)
+		ax.set_ylim(-1.3,1.3)
+		ax.set_axis_off()
+		fig.savefig(fileName,format=self.format(fmt))
+		plt.close(fig)
+
+
+RENDERERS={"graph_tool":GraphToolRenderer,"dot":DotRenderer,"matplotlib":MatplotlibRenderer}
+
+
+## renderer from its name (one of RENDERERS)
+def getRenderer(name):
+	if not (name in RENDERERS):
+		raise ValueError("Unknown renderer "+name+", use one of "+", ".join(sorted(RENDERERS.keys())))
+	return RENDERERS[name]()
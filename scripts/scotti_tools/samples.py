@@ -0,0 +1,119 @@
+# Sampling hosts, sampling dates and host times given to SCOTTI_generate_xml.py
+#
+# Each csv file is read whole. A line is split at commas after removing its
+# whitespace, blank lines are skipped and the file ends at the first line with too
+# few fields, as in the original readers of the script. The entries are then checked
+# against each other and against the samples of the fasta file in one pass, with an
+# index of the samples of each host, and every problem found is reported rather
+# than only the first one.
+
+
+## times of a host with no entry in the host times file: available throughout
+UNLIMITED_TIMES=[-1000000000000,1000000000000]
+
+
+## does it represent a number?
+def isFloat(text):
+	try:
+		float(text)
+		return True
+	except ValueError:
+		return False
+
+
+## Rows of a csv file, each a list of at least numFields fields (see the top of this file)
+def readCsvRows(fileName,numFields):
+	inpF=open(fileName)
+	lines=inpF.read().splitlines()
+	inpF.close()
+	rows=[]
+	for line in lines:
+		fields=("".join(line.split())).split(",")
+		if fields==[""]:
+			continue
+		if len(fields)<numFields:
+			break
+		rows.append(fields)
+	return rows
+
+
+## Hosts, dates and host times of the samples of a fasta file (a FastaIndex).
+## Problems are collected in errors and warnings, in the order they are found.
+class SampleInputs:
+
+	def __init__(self,seqs,hostsFile,datesFile,hostTimesFile):
+		self.errors=[]
+		self.warnings=[]
+		# sample -> host, sample -> date, and host -> [start, end], in file order
+		self.hosts={}
+		self.dates={}
+		self.hostTimes={}
+		# host -> its samples, in order of first appearance in the hosts file
+		self.samplesOf={}
+		self.readHosts(hostsFile,seqs)
+		self.readDates(datesFile,seqs)
+		self.readHostTimes(hostTimesFile)
+		self.check(seqs)
+
+	## read the host of each sample
+	def readHosts(self,fileName,seqs):
+		for fields in readCsvRows(fileName,2):
+			sam=fields[0]
+			hos=fields[1]
+			if not (sam in seqs):
+				self.errors.append("Error: sample "+sam+" found in sample-host file but not found in the fasta file.")
+			elif sam in self.hosts:
+				self.errors.append("Error, multiple entries with same name "+sam+" in hosts file. ")
+			else:
+				self.hosts[sam]=hos
+				self.samplesOf.setdefault(hos,[]).append(sam)
+
+	## read the sampling date of each sample
+	def readDates(self,fileName,seqs):
+		for fields in readCsvRows(fileName,2):
+			sam=fields[0]
+			dat=fields[1]
+			if not isFloat(dat):
+				self.errors.append("Error: date "+dat+" for sample "+sam+" cannot be converted to a number")
+			elif not (sam in seqs):
+				self.errors.append("Error: sample "+sam+" found in sampling dates file but not found in the fasta file.")
+			elif sam in self.dates:
+				self.errors.append("Error, multiple entries with same name "+sam+" in dates file. ")
+			else:
+				self.dates[sam]=float(dat)
+
+	## read the start of infectability and end of infectiousness of each host
+	def readHostTimes(self,fileName):
+		for fields in readCsvRows(fileName,3):
+			hos=fields[0]
+			if not (isFloat(fields[1]) and isFloat(fields[2])):
+				self.errors.append("Error: date "+fields[1]+" or "+fields[2]+" for host "+hos+" cannot be converted to a number")
+			elif hos in self.hostTimes:
+				self.errors.append("Error, multiple entries with same name "+hos+" in hosts-times file. ")
+			else:
+				self.hostTimes[hos]=[float(fields[1]),float(fields[2])]
+
+	## check that every sample has a date and a host, and that every host has times
+	## and samples, and that the samples were taken while their host was infected
+	def check(self,seqs):
+		for s in seqs.names:
+			if not (s in self.dates):
+				self.errors.append("Error, no date specified for sample "+s)
+			if not (s in self.hosts):
+				self.errors.append("Error, no host specified for sample "+s)
+		for h in self.samplesOf:
+			if not (h in self.hostTimes):
+				self.warnings.append("Warning: no dates specified for host "+h+". I will assume this host is available throughout")
+				self.hostTimes[h]=list(UNLIMITED_TIMES)
+		for h in self.hostTimes:
+			if not (h in self.samplesOf):
+				self.warnings.append("Warning: no sample specified for host "+h+". I will assume this host could have been infected or not. If you are sure this host was infected, then please include a non-informative sample (all \"N\"s) from it.")
+		for s in seqs.names:
+			if not (s in self.dates and s in self.hosts):
+				continue
+			h=self.hosts[s]
+			start,end=self.hostTimes[h]
+			if self.dates[s]<=start:
+				self.errors.append("Error, sampling time "+str(self.dates[s])+" of sample "+s+" must be after start of infectability time "+str(start)+" of host "+h)
+			if self.dates[s]>=end:
+				self.errors.append("Error, sampling time "+str(self.dates[s])+" of sample "+s+" must be before end of infectiousness time "+str(end)+" of host "+h)
@@ -0,0 +1,86 @@
+# Summarise a subset of the trees of a file
+#
+# Of the trees after the burnin, those whose state is in a range are kept, then
+# every thin-th of them, then at most maxTrees of those, evenly spaced or sampled
+# at random (reservoir sampling, in the same pass). The trees are selected from
+# the start of their line only, and only the selected ones are parsed.
+
+import random
+
+
+## Parse a range of states "a:b" (either bound can be left out), returns (a, b)
+## with None for a missing bound
+def parseStateRange(text):
+	bounds=text.split(":")
+	if len(bounds)!=2:
+		raise ValueError("a range of states must be written a:b, not "+text)
+	low=None
+	high=None
+	if bounds[0].strip()!="":
+		low=int(bounds[0])
+	if bounds[1].strip()!="":
+		high=int(bounds[1])
+	if low!=None and high!=None and high<low:
+		raise ValueError("empty range of states "+text)
+	return (low,high)
+
+
+## Which trees to summarise after the burnin
+class TreeSelection:
+
+	def __init__(self,thin=1,maxTrees=0,stateRange=(None,None),reservoir=False,seed=1):
+		if thin<1:
+			raise ValueError("thin must be at least 1")
+		self.thin=thin
+		self.maxTrees=maxTrees
+		self.low,self.high=stateRange
+		self.reservoir=reservoir
+		self.seed=seed
+
+	## True if every tree after the burnin is selected
+	def selectsAll(self):
+		return self.thin==1 and self.maxTrees<=0 and self.low==None and self.high==None
+
+	## Keys of the selected trees, in order, from (key, state) for the trees after the
+	## burnin in file order. The keys are byte offsets or tree indices, both increasing.
+	def select(self,trees):
+		rand=random.Random(self.seed)
+		chosen=[]
+		inRange=0
+		for key,state in trees:
+			if self.low!=None and (state==None or state<self.low):
+				continue
+			if self.high!=None and (state==None or state>self.high):
+				# states increase along the file
+				if state!=None:
+					break
+				continue
+			inRange+=1
+			if (inRange-1)%self.thin!=0:
+				continue
+			if self.reservoir and self.maxTrees>0:
+				candidates=(inRange-1)//self.thin
+				if len(chosen)<self.maxTrees:
+					chosen.append(key)
+				else:
+					replaced=rand.randrange(candidates+1)
+					if replaced<self.maxTrees:
+						chosen[replaced]=key
+			else:
+				chosen.append(key)
+		if self.reservoir:
+			chosen.sort()
+		elif self.maxTrees>0 and len(chosen)>self.maxTrees:
+			chosen=[chosen[(i*len(chosen))//self.maxTrees] for i in range(self.maxTrees)]
+		return chosen
+
+	## description of the selection, for the messages of the scripts
+	def describe(self):
+		parts=[]
+		if self.low!=None or self.high!=None:
+			parts.append("states "+("" if self.low==None else str(self.low))+":"+("" if self.high==None else str(self.high)))
+		if self.thin>1:
+			parts.append("every "+str(self.thin)+" trees")
+		if self.maxTrees>0:
+			parts.append("at most "+str(self.maxTrees)+" trees, "+("sampled at random" if self.reservoir else "evenly spaced"))
+		return ", ".join(parts)
@@ -0,0 +1,163 @@
+# Summarise the transmissions of a .trees file in one call
+
+import numpy as np
+
+from .counts import newCounts
+from .treesfile import countTrees, treeOffset, readTreeOffsets, readTreeStates, treesBeforeState
+from .newick import parseTree
+from .batch import BATCH_TREES, countTreesAt
+from .parallel import summariseParallel
+from .batchmeans import batchSizeFor
+from .cache import openCache
+from .checkpoint import saveCheckpoint, loadCheckpoint
+from .output import writeNetwork, writeTablesCsv, writeSummaryJson, writeCsv, errorTable
+
+
+## Summary of the trees of a file after the burnin. Counts are in the order of
+## hosts (see TransmissionCounts.ordered), and the probabilities are the counts
+## divided by the number of trees summarised. Pairs of hosts are in EdgeLists
+## (see scotti_tools.edges), of the observed pairs only:
+##   directProb, indirectProb  host x host, from source to target
+##   rootProb                  array of the hosts
+##   originProb                host x originHosts (the hosts, "Unsampled" and "doubleOrigin")
+class TransmissionSummary:
+
+	def __init__(self,counts,totTrees,burned):
+		self.counts=counts
+		self.hosts=list(counts.hosts)
+		self.originHosts=self.hosts+["Unsampled","doubleOrigin"]
+		self.numTrees=counts.numTrees
+		self.totTrees=totTrees
+		self.burned=burned
+		self.directTrans,self.indirectTrans,self.roots,self.totOrigins=counts.ordered()
+		self.directProb=self.directTrans.divided(self.numTrees)
+		self.indirectProb=self.indirectTrans.divided(self.numTrees)
+		self.rootProb=self.roots/float(max(1,self.numTrees))
+		self.originProb=self.totOrigins.divided(self.numTrees)
+
+	## write the summary as text (see output.writeNetwork)
+	def writeNetwork(self,fileName):
+		writeNetwork(fileName,self.hosts,self.numTrees,self.directTrans,self.indirectTrans,self.roots,self.totOrigins)
+
+	## Write the edge, root and origin tables (see output.summaryTables) as
+	## prefix_edges.csv, prefix_roots.csv and prefix_origins.csv with "csv" in formats,
+	## and as prefix_network.json with "json". Returns the names of the files written.
+	def writeTables(self,prefix,formats=("csv","json")):
+		names=[]
+		if "csv" in formats:
+			names.extend(writeTablesCsv(prefix,self))
+		if "json" in formats:
+			writeSummaryJson(prefix+"_network.json",self)
+			names.append(prefix+"_network.json")
+		return names
+
+	## True if the Monte Carlo errors were estimated (see summariseTrees)
+	def hasErrors(self):
+		return self.counts.batchMeans!=None
+
+	## Write the Monte Carlo standard error (MCSE) and effective sample size (ESS) of
+	## the probabilities as a csv file (see output.errorTable)
+	def writeErrors(self,fileName):
+		writeCsv(fileName,errorTable(self))
+
+
+## Summarise the trees of fileName after discarding the first burnin percent of them.
+## hosts are listed first, in this order (see TransmissionCounts.addHosts). The parsed
+## trees are read from a cache with cache=True, or by jobs processes; otherwise the
+## counts are saved every checkpointEvery trees in the checkpoint file if one is given,
+## and reading resumes from it. With a selection (a TreeSelection), only the trees it
+## selects after the burnin are summarised, and no checkpoint is saved. With
+## errors=True, batch means of about the square root of the number of trees
+## summarised are kept for the Monte Carlo errors (see TransmissionSummary.errors).
+## With burninState, the trees before the first one of this MCMC state are discarded
+## instead (e.g. the burnin found in the trace log, see TraceLog.burnin).
+## With verbose=True the progress is printed.
+def summariseTrees(fileName,burnin=20,hosts=(),cache=False,jobs=1,checkpoint="",checkpointEvery=1000,verbose=False,selection=None,errors=False,burninState=None):
+	## Find burnin from the number of trees in the file
+	if cache:
+		treeCache=openCache(fileName)
+		totTrees=treeCache.numTrees
+	else:
+		totTrees=countTrees(fileName)
+	if burninState!=None:
+		if cache:
+			later=np.nonzero((treeCache.states<0)|(treeCache.states>=burninState))[0]
+			burned=int(later[0]) if len(later)>0 else totTrees
+		else:
+			burned=treesBeforeState(fileName,burninState)
+	else:
+		burned=int((float(burnin)/100)*totTrees)
+	if verbose:
+		if burninState!=None:
+			print("The first "+str(burned)+" trees out of "+str(totTrees)+", before state "+str(burninState)+", will be discarded as burnin.")
+		else:
+			print("The first "+str(burned)+" trees out of "+str(totTrees)+" will be discarded as burnin.")
+	if selection!=None and selection.selectsAll():
+		selection=None
+	batchSize=0
+
+	## Read file once to find trees and collect values
+	if selection!=None:
+		## Select the trees from their states, then parse the selected ones only
+		if cache:
+			indices=selection.select((i,int(treeCache.states[i])) for i in range(burned,treeCache.numTrees))
+			if errors:
+				batchSize=batchSizeFor(len(indices))
+			counts=newCounts(batchSize,treeCache.hostIndex)
+			counts.addHosts(hosts)
+			for batch in treeCache.batchesAt(indices):
+				counts.addBatch(*batch)
+		else:
+			offsets=selection.select(readTreeStates(fileName,treeOffset(fileName,burned)))
+			if errors:
+				batchSize=batchSizeFor(len(offsets))
+			if jobs>1:
+				counts=summariseParallel(fileName,burned,jobs,hosts,offsets,batchSize)
+			else:
+				counts=newCounts(batchSize)
+				counts.addHosts(hosts)
+				countTreesAt(counts,fileName,offsets)
+		if verbose:
+			print("Summarising "+str(counts.numTrees)+" selected trees ("+selection.describe()+").")
+	elif cache:
+		if errors:
+			batchSize=batchSizeFor(totTrees-burned)
+		counts=newCounts(batchSize,treeCache.hostIndex)
+		counts.addHosts(hosts)
+		for batch in treeCache.batches(burned):
+			counts.addBatch(*batch)
+	elif jobs>1:
+		if errors:
+			batchSize=batchSizeFor(totTrees-burned)
+		counts=summariseParallel(fileName,burned,jobs,hosts,batchSize=batchSize)
+	else:
+		if errors:
+			batchSize=batchSizeFor(totTrees-burned)
+		resumed=None
+		if checkpoint!="":
+			resumed=loadCheckpoint(checkpoint,fileName,burned,batchSize)
+		if resumed!=None:
+			counts,start=resumed
+			if verbose:
+				print("Resuming from checkpoint "+checkpoint+" after "+str(counts.numTrees)+" trees.")
+		else:
+			counts=newCounts(batchSize)
+			counts.addHosts(hosts)
+			start=treeOffset(fileName,burned)
+		offset=start
+		tables=[]
+		for offset,state,tree in readTreeOffsets(fileName,start):
+			tables.append(parseTree(tree,counts.hostIndex))
+			# trees are counted BATCH_TREES at a time, and whenever a checkpoint is due
+			if len(tables)==BATCH_TREES or (checkpoint!="" and (counts.numTrees+len(tables))%checkpointEvery==0):
+				counts.addTrees(tables)
+				tables=[]
+				if checkpoint!="" and counts.numTrees%checkpointEvery==0:
+					saveCheckpoint(checkpoint,counts,fileName,burned,offset)
+		counts.addTrees(tables)
+		if checkpoint!="":
+			saveCheckpoint(checkpoint,counts,fileName,burned,offset)
+	summary=TransmissionSummary(counts,totTrees,burned)
+	if verbose and selection==None and burninState==None and summary.numTrees!=totTrees-burned:
+		print("Warning: "+str(summary.numTrees+burned)+" trees were found in the file instead of "+str(totTrees)+", the burnin might not be exactly "+str(burnin)+"%.")
+	return summary
@@ -0,0 +1,61 @@
+# Grids of settings of SCOTTI_generate_xml.py
+#
+# A grid gives several values to some of the settings of the model and of the MCMC,
+# and one analysis is written for each combination of them. Only the part of the
+# xml after the data and the trait sets depends on these settings.
+
+
+## does it represent true or false?
+def parseBool(text):
+	if text.lower() in ("true","yes","1"):
+		return True
+	if text.lower() in ("false","no","0"):
+		return False
+	raise ValueError(text+" is not true or false")
+
+
+## settings that a grid can vary, and how to read their values
+SWEEP_SETTINGS={"maxHosts":int,"unlimLife":parseBool,"penalizeMigration":parseBool,"mutationModel":str,"numIter":int}
+
+
+## Parse a grid option "setting=value1,value2,...", returns (setting, values)
+def parseGridOption(text):
+	if text.count("=")!=1:
+		raise ValueError("a grid option must be written setting=value1,value2,..., not "+text)
+	name,values=text.split("=")
+	name=name.strip()
+	if not (name in SWEEP_SETTINGS):
+		raise ValueError("setting "+name+" cannot be varied, only "+", ".join(SWEEP_SETTINGS.keys())+" can")
+	values=[SWEEP_SETTINGS[name](value.strip()) for value in values.split(",") if value.strip()!=""]
+	if len(values)==0:
+		raise ValueError("no values given for setting "+name)
+	for i,value in enumerate(values):
+		if value in values[:i]:
+			raise ValueError("value "+str(value)+" is given more than once for setting "+name)
+	return (name,values)
+
+
+## Parse the grid options, returns a list of (setting, values)
+def parseGrid(options):
+	grid=[]
+	for text in options:
+		name,values=parseGridOption(text)
+		if name in [entry[0] for entry in grid]:
+			raise ValueError("setting "+name+" is given more than once in the grid")
+		grid.append((name,values))
+	return grid
+
+
+## Combinations of the values of a grid, a list of (setting, values) with one entry
+## per setting, as dicts setting -> value. The last setting varies fastest.
+def gridSettings(grid):
+	combinations=[{}]
+	for name,values in grid:
+		combinations=[dict(combination,**{name:value}) for combination in combinations for value in values]
+	return combinations
+
+
+## name of the analysis of a combination of settings: the output name followed by
+## each setting and its value
+def sweepName(output,combination):
+	return output+"".join(["_"+name+str(value) for name,value in combination.items()])
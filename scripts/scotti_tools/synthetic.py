@@ -0,0 +1,97 @@
+# Deterministic synthetic SCOTTI trees files, for benchmarks
+
+import random
+
+
+## Random coalescent tree with numTips tips: returns the root, the children of
+## each internal node and the height of each node (tips are nodes 0..numTips-1)
+def randomTopology(rand,numTips):
+	lineages=list(range(numTips))
+	children={}
+	height=[0.0]*numTips
+	time=0.0
+	node=numTips
+	while len(lineages)>1:
+		time+=rand.expovariate(len(lineages)*(len(lineages)-1)/2.0)
+		i,j=rand.sample(range(len(lineages)),2)
+		children[node]=(lineages[i],lineages[j])
+		height.append(time)
+		lineages[i]=node
+		lineages[j]=lineages[-1]
+		lineages.pop()
+		node+=1
+	return lineages[0],children,height
+
+
+## Newick string of one tree with SCOTTI annotations. Internal nodes take the host
+## of one of their tips, or are Unsampled with probability unsampled, and the number
+## of transmissions of each branch is consistent with the hosts at its two ends.
+def syntheticTree(rand,tipHosts,unsampled):
+	numTips=len(tipHosts)
+	root,children,height=randomTopology(rand,numTips)
+	annotations={}
+	order=[]
+	# pre-order walk: (node, host of the parent node, host and number of transmissions passed down)
+	stack=[(root,None,None,0)]
+	while stack:
+		node,parentNodeHost,parentHost,numTrans=stack.pop()
+		order.append(node)
+		if node<numTips:
+			host=tipHosts[node]
+		elif rand.random()<unsampled:
+			host="Unsampled"
+		else:
+			below=node
+			while below>=numTips:
+				below=children[below][rand.randrange(2)]
+			host=tipHosts[below]
+		if parentNodeHost==None or (host==parentNodeHost and rand.random()<0.7):
+			k=0
+		elif host==parentHost:
+			k=max(1,2-numTrans)+rand.randint(0,1)
+		else:
+			k=1+int(rand.expovariate(1.5))
+		annotations[node]=(host,k)
+		if parentHost==None:
+			passed=(host,0)
+		elif k==0:
+			passed=(parentHost,numTrans)
+		elif host=="Unsampled":
+			passed=(parentHost,numTrans+k)
+		else:
+			passed=(host,0)
+		if node>=numTips:
+			for child in reversed(children[node]):
+				stack.append((child,host,passed[0],passed[1]))
+	# write the tree bottom-up, each node followed by the length of the branch above it
+	text={}
+	for node in reversed(order):
+		host,k=annotations[node]
+		if node>=numTips:
+			left,right=children[node]
+			label="("+text.pop(left)+":"+repr(height[node]-height[left])+","+text.pop(right)+":"+repr(height[node]-height[right])+")"
+		else:
+			label=""
+		text[node]=label+str(node+1)+"[&host="+host+",numTransmissions="+str(k)+"]"
+	return text[root]+":0.0;"
+
+
+## Write a NEXUS trees file like those of the BEAST2 tree logger with numTrees trees
+## of numTips tips spread over numHosts hosts. The same seed gives the same file.
+def writeSyntheticTrees(fileName,numTips,numHosts,numTrees,unsampled=0.2,seed=1,logEvery=1000):
+	rand=random.Random(seed)
+	hosts=["H"+str(i+1) for i in range(numHosts)]
+	tipHosts=[hosts[i] if i<numHosts else rand.choice(hosts) for i in range(numTips)]
+	names=[tipHosts[i]+"-"+str(i+1) for i in range(numTips)]
+	outF=open(fileName,"w")
+	outF.write("#NEXUS\n\nBegin taxa;\n\tDimensions ntax="+str(numTips)+";\n\t\tTaxlabels\n")
+	for name in names:
+		outF.write("\t\t\t"+name+"\n")
+	outF.write("\t\t\t;\nEnd;\nBegin trees;\n\tTranslate\n")
+	for i in range(numTips):
+		outF.write("\t\t\t"+str(i+1)+" "+names[i]+(",\n" if i<numTips-1 else "\n"))
+	outF.write("\t\t\t;\n")
+	for i in range(numTrees):
+		outF.write("tree STATE_"+str(i*logEvery)+" = "+syntheticTree(rand,tipHosts,unsampled)+"\n")
+	outF.write("End;\n")
+	outF.close()
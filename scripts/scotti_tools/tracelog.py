@@ -0,0 +1,139 @@
+# Reader and convergence diagnostics for the trace logs (.log) written by BEAST2
+#
+# A trace log is a tab separated table, after a header of "#" lines (the model),
+# with a line of column names and then one line per logged state, the state in the
+# first column. Only the columns asked for are read, all lines at once, each column
+# as an array. The log of a run in progress can end with an incomplete line, which
+# is left out.
+#
+# The autocorrelation of a trace is computed for all lags at once by FFT. The
+# effective sample size (ESS) sums it up to the first lag pair whose sum is not
+# positive (Geyer's initial positive sequence). The burnin is the start that
+# minimises the marginal standard error of the rest of the trace (the MSER rule, on
+# the means of batches of a few samples), among the starts in the first half.
+
+import numpy as np
+
+
+## number of samples averaged in each batch by the MSER rule
+MSER_BATCH=5
+
+
+## the trace log cannot be read
+class TraceLogError(ValueError):
+	pass
+
+
+## Columns of a trace log (see the top of this file)
+class TraceLog:
+
+	def __init__(self,fileName,columns=None):
+		self.fileName=fileName
+		# all column names of the log, and the states and values of the columns read
+		self.names=[]
+		self.states=np.zeros(0,dtype=np.int64)
+		self.columns={}
+		self.read(columns)
+
+	def __len__(self):
+		return len(self.states)
+
+	## read the states and the given columns (all of them by default), in one go
+	def read(self,columns):
+		inpF=open(self.fileName)
+		for line in inpF:
+			if line.startswith("#") or line.strip()=="":
+				continue
+			self.names=line.rstrip("\r\n").split("\t")
+			break
+		if len(self.names)<2:
+			inpF.close()
+			raise TraceLogError("Error, no column names found in trace log "+self.fileName+", is this a BEAST2 log file?")
+		if columns==None:
+			columns=self.names[1:]
+		for name in columns:
+			if not (name in self.names):
+				inpF.close()
+				raise TraceLogError("Error, column "+name+" not found in trace log "+self.fileName+", its columns are "+", ".join(self.names[1:]))
+		lines=[line for line in inpF.read().splitlines() if line.strip()!=""]
+		inpF.close()
+		values=self.loadColumns(lines,[0]+[self.names.index(name) for name in columns])
+		self.states=values[:,0].astype(np.int64)
+		self.columns=dict((name,values[:,i+1]) for i,name in enumerate(columns))
+
+	## values of the columns usecols of the lines, as an array with one row per line.
+	## The last line is left out if it cannot be read (it is still being written).
+	def loadColumns(self,lines,usecols):
+		for numLines in (len(lines),len(lines)-1):
+			if numLines<=0:
+				break
+			try:
+				return np.loadtxt(lines[:numLines],dtype=float,delimiter="\t",usecols=usecols,ndmin=2)
+			except (ValueError,IndexError):
+				continue
+		if numLines>0:
+			raise TraceLogError("Error, the values of trace log "+self.fileName+" cannot be read, a line before the last one is incomplete or not a number.")
+		return np.zeros((0,len(usecols)))
+
+	## Index of the first sample after the burnin: the latest of the burnins of the
+	## given columns (all columns read by default), and these burnins by column
+	def burnin(self,columns=None):
+		if columns==None:
+			columns=list(self.columns.keys())
+		starts=dict((name,stationaryStart(self.columns[name])) for name in columns)
+		return max([0]+list(starts.values())),starts
+
+	## ESS of a column from sample start on
+	def ess(self,name,start=0):
+		return effectiveSampleSize(self.columns[name][start:])
+
+
+## Autocorrelation of a trace at lags 0 to its length - 1 (all 0 for a constant trace)
+def autocorrelation(values):
+	x=np.asarray(values,dtype=float)
+	n=len(x)
+	if n==0:
+		return np.zeros(0)
+	x=x-np.mean(x)
+	size=1<<int(2*n-1).bit_length()
+	transform=np.fft.rfft(x,size)
+	covariance=np.fft.irfft(transform*np.conj(transform),size)[:n]
+	if covariance[0]<=0:
+		return np.zeros(n)
+	return covariance/covariance[0]
+
+
+## Effective sample size of a trace, at most its length (nan if it is constant)
+def effectiveSampleSize(values):
+	n=len(values)
+	rho=autocorrelation(values)
+	if n<2:
+		return float(n)
+	if rho[0]==0:
+		return float("nan")
+	numPairs=n//2
+	pairs=rho[0:2*numPairs:2]+rho[1:2*numPairs:2]
+	negative=np.nonzero(pairs<=0)[0]
+	if len(negative)>0:
+		pairs=pairs[:negative[0]]
+	time=2.0*np.sum(pairs)-1.0
+	if time<=1.0:
+		return float(n)
+	return n/time
+
+
+## Index of the first sample of the stationary part of a trace, by the MSER rule
+## on batches of MSER_BATCH samples (0 if the trace is too short)
+def stationaryStart(values,batch=MSER_BATCH):
+	numBatches=len(values)//batch
+	if numBatches<4:
+		return 0
+	means=np.asarray(values[:numBatches*batch],dtype=float).reshape(numBatches,batch).mean(axis=1)
+	# centred on the last half, so that the sums of squares keep their precision
+	means=means-np.mean(means[numBatches//2:])
+	# sums, sums of squares and numbers of the batches from each start to the end
+	sums=np.cumsum(means[::-1])[::-1]
+	squares=np.cumsum((means*means)[::-1])[::-1]
+	lengths=np.arange(numBatches,0,-1,dtype=float)
+	error=np.maximum(squares-sums*sums/lengths,0.0)/(lengths*lengths)
+	return int(np.argmin(error[:numBatches//2+1]))*batch
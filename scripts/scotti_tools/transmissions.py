@@ -0,0 +1,15 @@
+# Origins and hosts of the sampled trees
+
+from .hosts import UNSAMPLED
+
+## origin of a host reached by direct transmissions from two different hosts
+DOUBLE_ORIGIN=-1
+
+
+## Append to hosts the names of the sampled hosts of a node table that are not in
+## known (in pre-order, as the nodes are stored), and add their ids to known
+def findNewHosts(table,known,hosts,hostNames):
+	for h in table.host:
+		if h!=UNSAMPLED and not (h in known):
+			known.add(h)
+			hosts.append(hostNames[h])
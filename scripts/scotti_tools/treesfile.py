@@ -0,0 +1,271 @@
+# Streaming reader for the .trees files written by the BEAST2 tree logger
+
+import os
+
+from .newick import TreeFormatError
+
+
+## number of bytes at the start of a tree line in which its state is looked for
+STATE_PREFIX=256
+
+
+## Read lines until the first tree, returns it (or closes the file and raises
+## TreeFormatError if there is none)
+def firstTreeLine(inpF):
+	line=inpF.readline()
+	while len(line.split())<1 or line.split()[0]!=b"tree":
+		if line==b"":
+			inpF.close()
+			raise TreeFormatError("Incorrect input file, is this a BEAST2 trees output file?")
+		line=inpF.readline()
+	return line
+
+
+## Split a tree line into its words ("tree", "STATE_x", "=", tree), or
+## return None if it does not have the expected number of words
+def splitTreeLine(line,normalL):
+	words=line.split(None,normalL)
+	if len(words)!=normalL or words[0]!=b"tree":
+		return None
+	return words
+
+
+## MCMC state of a tree line, or None if it is not labelled STATE_x
+def treeState(line):
+	words=line.split(None,2)
+	if len(words)<2 or words[0]!=b"tree" or not words[1].startswith(b"STATE_"):
+		return None
+	try:
+		return int(words[1][6:])
+	except ValueError:
+		return None
+
+
+## State of the last tree in the file, found by reading backwards from the end
+def lastTreeState(inpF,start):
+	inpF.seek(0,os.SEEK_END)
+	size=inpF.tell()
+	block=1<<16
+	while True:
+		pos=max(start,size-block)
+		inpF.seek(pos)
+		data=inpF.read(size-pos)
+		index=data.rfind(b"\ntree ")
+		if index>=0:
+			return treeState(data[index+1:index+1+STATE_PREFIX])
+		if pos==start:
+			return None
+		block*=2
+
+
+## Number of trees in the file.
+## The tree logger samples every logEvery states, so the count follows from the
+## states of the first two and of the last tree without reading the whole file.
+## If the states are not evenly spaced, the tree lines are counted instead.
+def countTrees(fileName):
+	inpF=open(fileName,"rb")
+	line=firstTreeLine(inpF)
+	start=inpF.tell()
+	normalL=len(line.split())
+	first=treeState(line)
+	line=inpF.readline()
+	if splitTreeLine(line,normalL)==None:
+		inpF.close()
+		return 1
+	second=treeState(line)
+	last=lastTreeState(inpF,start)
+	if first!=None and second!=None and last!=None and second>first and last>=second and (last-first)%(second-first)==0:
+		inpF.close()
+		return (last-first)//(second-first)+1
+	inpF.seek(start)
+	numTrees=1
+	for line in inpF:
+		if splitTreeLine(line,normalL)==None:
+			break
+		numTrees+=1
+	inpF.close()
+	return numTrees
+
+
+## Yield (state, tree) for every tree in the file after the first skip ones, the
+## trees as bytes. The file is read once, line by line, and skipped trees are never split.
+def readTrees(fileName,skip=0):
+	inpF=open(fileName,"rb")
+	line=firstTreeLine(inpF)
+	normalL=len(line.split())
+	numTrees=0
+	while line!=b"":
+		if numTrees<skip:
+			if not line.startswith(b"tree"):
+				break
+		else:
+			words=splitTreeLine(line,normalL)
+			if words==None:
+				break
+			state=treeState(line)
+			yield (state,words[normalL-1])
+		numTrees+=1
+		line=inpF.readline()
+	inpF.close()
+
+
+## Offset of the first line starting with "tree" at or after byte offset pos
+## (the size of the file if there is none), and leave the file at that offset.
+## The line containing pos is skipped unless pos is at its start.
+def nextTreeOffset(inpF,pos):
+	if pos>0:
+		inpF.seek(pos-1)
+		inpF.readline()
+	else:
+		inpF.seek(0)
+	offset=inpF.tell()
+	line=inpF.readline()
+	while line!=b"" and not line.startswith(b"tree"):
+		offset=inpF.tell()
+		line=inpF.readline()
+	inpF.seek(offset)
+	return offset
+
+
+## Offset of the line of the tree after the first skip ones.
+## With evenly spaced states the line is found by bisection on the state of
+## the trees, otherwise the first skip tree lines are read.
+def treeOffset(fileName,skip=0):
+	inpF=open(fileName,"rb")
+	line=firstTreeLine(inpF)
+	start=inpF.tell()-len(line)
+	if skip==0:
+		inpF.close()
+		return start
+	first=treeState(line)
+	second=treeState(inpF.readline())
+	if first!=None and second!=None and second>first:
+		target=first+skip*(second-first)
+		inpF.seek(0,os.SEEK_END)
+		low=start
+		high=inpF.tell()
+		while low<high:
+			mid=(low+high)//2
+			offset=nextTreeOffset(inpF,mid)
+			state=treeState(inpF.readline())
+			if state==None or state>=target:
+				high=mid
+			else:
+				low=mid+1
+		offset=nextTreeOffset(inpF,low)
+		if treeState(inpF.readline())==target:
+			inpF.close()
+			return offset
+	inpF.seek(start)
+	numTrees=0
+	offset=start
+	line=inpF.readline()
+	while numTrees<skip and line.startswith(b"tree"):
+		numTrees+=1
+		offset=inpF.tell()
+		line=inpF.readline()
+	inpF.close()
+	return offset
+
+
+## Split the trees from byte offset start to the end of the file into at most
+## numChunks byte ranges of similar size, each starting at a tree line
+def splitTrees(fileName,start,numChunks):
+	inpF=open(fileName,"rb")
+	inpF.seek(0,os.SEEK_END)
+	size=inpF.tell()
+	bounds=[start]
+	for i in range(1,numChunks):
+		offset=nextTreeOffset(inpF,start+(i*(size-start))//numChunks)
+		if offset>bounds[-1]:
+			bounds.append(offset)
+	bounds.append(size)
+	inpF.close()
+	return [(bounds[i],bounds[i+1]) for i in range(len(bounds)-1)]
+
+
+## Yield (offset of the next line, state, tree bytes) for the trees whose line
+## starts in the byte range [start, end), by default up to the end of the file
+def readTreeOffsets(fileName,start,end=None):
+	inpF=open(fileName,"rb")
+	inpF.seek(start)
+	offset=start
+	line=inpF.readline()
+	normalL=len(line.split())
+	while (end==None or offset<end) and line!=b"":
+		words=splitTreeLine(line,normalL)
+		if words==None:
+			break
+		offset+=len(line)
+		yield (offset,treeState(line),words[normalL-1])
+		line=inpF.readline()
+	inpF.close()
+
+
+## Yield (state, tree bytes) for the trees whose line starts in the byte range [start, end)
+def readTreeRange(fileName,start,end=None):
+	for offset,state,tree in readTreeOffsets(fileName,start,end):
+		yield (state,tree)
+
+
+## Yield (offset, state) for the tree lines from byte offset start. Only the
+## start of each line is split to find its state, the trees are not.
+def readTreeStates(fileName,start):
+	inpF=open(fileName,"rb")
+	inpF.seek(start)
+	offset=start
+	for line in inpF:
+		if not line.startswith(b"tree"):
+			break
+		yield (offset,treeState(line[:STATE_PREFIX]))
+		offset+=len(line)
+	inpF.close()
+
+
+## Number of trees of the file before the first one of MCMC state at least state.
+## Only the start of the lines of these trees is read.
+def treesBeforeState(fileName,state):
+	numTrees=0
+	for offset,lineState in readTreeStates(fileName,treeOffset(fileName,0)):
+		if lineState==None or lineState>=state:
+			break
+		numTrees+=1
+	return numTrees
+
+
+## Yield (state, tree bytes) for the tree lines at the given byte offsets
+def readTreesAt(fileName,offsets):
+	inpF=open(fileName,"rb")
+	normalL=None
+	for offset in offsets:
+		inpF.seek(offset)
+		line=inpF.readline()
+		if normalL==None:
+			normalL=len(line.split())
+		words=splitTreeLine(line,normalL)
+		if words==None:
+			break
+		yield (treeState(line),words[normalL-1])
+	inpF.close()
+
+
+## Sample names of the Translate block of the file (tip number -> name), or an
+## empty dict if the file has none
+def readTranslate(fileName):
+	inpF=open(fileName,"rb")
+	translate={}
+	line=inpF.readline()
+	while line!=b"" and not line.startswith(b"tree"):
+		if line.split()==[b"Translate"]:
+			line=inpF.readline()
+			while line!=b"" and line.strip()!=b";":
+				words=line.replace(b",",b" ").split()
+				if len(words)>1:
+					translate[words[0].decode()]=words[1].decode()
+				if line.rstrip().endswith(b";"):
+					break
+				line=inpF.readline()
+			break
+		line=inpF.readline()
+	inpF.close()
+	return translate